@@ -0,0 +1,175 @@
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from RE.FiniteStateMachine import KeyType, Symbol
+
+__all__ = (
+    "AhoCorasickAutomaton",
+)
+
+
+class AhoCorasickAutomaton:
+    """Aho-Corasick automaton of a set of keywords.
+
+    The keywords are stored in a trie (state 0 being the root), and every state has a failure link to the state of
+    the longest proper suffix of its prefix that is also in the trie. Anchored matching (run, last, accepts and
+    longest) only follows the trie, while searching follows the failure links when the trie has no transition, so a
+    search reads every character once (plus the failure links taken, which are at most as many as the characters) no
+    matter how many keywords there are.
+
+    Attributes:
+        state_count (int): Number of states of the trie.
+
+    Structures:
+        goto (list of dict of str and int): The next state of each state for each element, in the trie.
+        fail (list of int): The failure link of each state.
+        depth (list of int): The length of the prefix of each state.
+        output (list of int): The length of the longest keyword that is a suffix of the prefix of each state, 0 if there
+            is none.
+        final_states (bytearray): 1 for the states of the keywords, 0 for the rest.
+
+    Examples:
+        >>> from RE.RegularExpression.Literal import Literal
+        >>> expression = Literal("if") | Literal("else") | Literal("elif") | Literal("while")
+        >>> expression.compile(mode="keywords")
+        >>> print(expression.search(input("> ")))
+    """
+
+    state_count: int
+    goto: List[Dict[str, int]]
+    fail: List[int]
+    depth: List[int]
+    output: List[int]
+    final_states: bytearray
+
+    def __init__(self, keywords: Iterable[str]):
+        super().__init__()
+        self.goto = [{}]
+        self.depth = [0]
+        self.final_states = bytearray(1)
+        for keyword in keywords:
+            state = 0
+            for element in keyword:
+                next_state = self.goto[state].get(element)
+                if next_state is None:
+                    next_state = self.goto[state][element] = len(self.goto)
+                    self.goto.append({})
+                    self.depth.append(self.depth[state] + 1)
+                    self.final_states.append(0)
+                state = next_state
+            self.final_states[state] = 1
+        self.state_count = len(self.goto)
+        self.fail = [0] * self.state_count
+        self.output = [0] * self.state_count
+        pending = deque(self.goto[0].values())
+        while pending:
+            state = pending.popleft()
+            self.output[state] = self.depth[state] if self.final_states[state] else self.output[self.fail[state]]
+            for element, next_state in self.goto[state].items():
+                fail_state = self.fail[state]
+                while fail_state and element not in self.goto[fail_state]:
+                    fail_state = self.fail[fail_state]
+                self.fail[next_state] = self.goto[fail_state].get(element, 0)
+                pending.append(next_state)
+
+    def __call__(self, string: str) -> Iterator[Tuple[KeyType, int]]:
+        return self.run(string)
+
+    def step(
+            self,
+            state: int,
+            element: str
+    ) -> int:
+        """int: Returns the next state of the state for the element in the trie, -1 if there is none."""
+        return self.goto[state].get(element, -1)
+
+    def run(
+            self,
+            string: str
+    ) -> Iterator[Tuple[KeyType, int]]:
+        """iter of tuple of str and int: Iterates the str through the trie."""
+        goto = self.goto
+        state = 0
+        for element in string:
+            state = goto[state].get(element, -1)
+            yield element, state
+            if state < 0:
+                return
+        yield Symbol.EOF, state
+
+    def last(
+            self,
+            string: str
+    ) -> int:
+        """int: Returns the last state of iterating the str through the trie, -1 if the trie got stuck."""
+        goto = self.goto
+        state = 0
+        for element in string:
+            state = goto[state].get(element, -1)
+            if state < 0:
+                break
+        return state
+
+    def accepts(
+            self,
+            string: str
+    ) -> bool:
+        """bool: Returns True if the str is a keyword."""
+        state = self.last(string)
+        return state >= 0 and self.final_states[state] == 1
+
+    def longest(
+            self,
+            string: str,
+            start: int = 0,
+            end: int = None
+    ) -> Optional[int]:
+        """int: Returns the end of the longest non-empty keyword that is a prefix of string[start:end], None if there
+            is none. The str is iterated once and the iteration stops as soon as the trie gets stuck."""
+        end = len(string) if end is None else end
+        goto = self.goto
+        final_states = self.final_states
+        state = 0
+        last_position = None
+        for position in range(start, end):
+            state = goto[state].get(string[position], -1)
+            if state < 0:
+                break
+            if final_states[state]:
+                last_position = position + 1
+        return last_position
+
+    def search(
+            self,
+            string: str,
+            start: int = 0,
+            end: int = None
+    ) -> Optional[Tuple[int, int]]:
+        """tuple of int and int: Returns the start and the end of the leftmost-longest non-empty keyword in
+            string[start:end], None if there is none.
+
+        The state after reading a position is the longest suffix of the str read that is a prefix of a keyword, so the
+        keywords that may still be matched start at least depth elements before the next position: once that is past
+        the start of the leftmost match, the search stops.
+        """
+        end = len(string) if end is None else end
+        goto = self.goto
+        fail = self.fail
+        depth = self.depth
+        output = self.output
+        root = goto[0]
+        state = 0
+        match_start = match_end = None
+        for position in range(start, end):
+            element = string[position]
+            while state and element not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(element, 0) if state else root.get(element, 0)
+            if match_start is not None and position + 1 - depth[state] > match_start:
+                break
+            if output[state]:
+                output_start = position + 1 - output[state]
+                if match_start is None or output_start <= match_start:
+                    match_start, match_end = output_start, position + 1
+        if match_start is not None:
+            return match_start, match_end
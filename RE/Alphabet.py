@@ -0,0 +1,131 @@
+from bisect import bisect_right
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+from RE.FiniteStateMachine import KeyType, Symbol
+from RE.IntervalSet import IntervalSet
+
+__all__ = (
+    "Alphabet",
+    "partition"
+)
+
+MAXIMUM_CODE_POINT = 0x10FFFF
+
+
+class Alphabet(dict):
+    """Partition of the elements (code points) in equivalence classes.
+
+    The code points are split in elementary intervals at the boundaries; every elementary interval belongs to a class.
+    An Alphabet is a dict of str and int that computes (with a bisect) and remembers the class of an element the first
+    time it is looked up, so alphabet[element] is a plain dict lookup on the matching hot path.
+
+    Attributes:
+        boundaries (list of int): The first code point of every elementary interval but the first one (which starts at
+            0).
+        interval_classes (list of int): The class of every elementary interval.
+        class_count (int): Number of classes, numbered from 0 to class_count - 1.
+        representatives (list of str): An element of every class.
+
+    Examples:
+        >>> from RE.Alphabet import partition
+        >>> from RE.IntervalSet import IntervalSet
+        >>> alphabet = partition([IntervalSet((ord("0"), ord("9"))), "5"])
+        >>> print(alphabet.class_count, alphabet["1"], alphabet["5"], alphabet["a"])
+    """
+
+    boundaries: List[int]
+    interval_classes: List[int]
+    class_count: int
+    representatives: List[str]
+
+    MEMORY = 1 << 16
+
+    def __init__(
+            self,
+            boundaries: List[int] = None,
+            interval_classes: List[int] = None
+    ):
+        super().__init__()
+        self.boundaries = [] if boundaries is None else boundaries
+        self.interval_classes = [0] if interval_classes is None else interval_classes
+        assert len(self.interval_classes) == len(self.boundaries) + 1
+        self.class_count = max(self.interval_classes) + 1
+        self.representatives = [None] * self.class_count
+        for i, element_class in reversed(list(enumerate(self.interval_classes))):
+            self.representatives[element_class] = chr(self.boundaries[i - 1] if i else 0)
+
+    def __missing__(self, element: str) -> int:
+        element_class = self.interval_classes[bisect_right(self.boundaries, ord(element))]
+        if len(self) < self.MEMORY:
+            self[element] = element_class
+        return element_class
+
+    def __reduce__(self):
+        return Alphabet, (self.boundaries, self.interval_classes)
+
+    def classes_of(self, element: KeyType) -> FrozenSet[int]:
+        """frozenset of int: Returns the classes of the elements matched by a transition element of the FSM."""
+        if element is Symbol.SIGMA:
+            return frozenset(range(self.class_count))
+        if type(element) is str:
+            return frozenset({self[element]}) if len(element) == 1 else frozenset()
+        if type(element) is frozenset:
+            return frozenset(self[_] for _ in element if type(_) is str and len(_) == 1)
+        if type(element) is IntervalSet:
+            classes = set()
+            for low, high in element.intervals:
+                classes.update(self.interval_classes[
+                    bisect_right(self.boundaries, low):bisect_right(self.boundaries, high) + 1
+                ])
+            return frozenset(classes)
+        return frozenset()
+
+    def interval_set(self, element_class: int) -> IntervalSet:
+        """IntervalSet: Returns the elements of a class."""
+        bounds = [0, *self.boundaries, MAXIMUM_CODE_POINT + 1]
+        return IntervalSet(*(
+            (bounds[i], bounds[i + 1] - 1)
+            for i, _element_class in enumerate(self.interval_classes)
+            if _element_class == element_class
+        ))
+
+    def remap(self, classes: List[int]) -> "Alphabet":
+        """Alphabet: Returns the alphabet where every class c becomes classes[c], merging the elementary intervals that
+            end up next to each other in the same class."""
+        boundaries = []
+        interval_classes = [classes[self.interval_classes[0]]]
+        for boundary, element_class in zip(self.boundaries, self.interval_classes[1:]):
+            if classes[element_class] != interval_classes[-1]:
+                boundaries.append(boundary)
+                interval_classes.append(classes[element_class])
+        return Alphabet(boundaries, interval_classes)
+
+
+def _intervals(element: KeyType) -> Tuple[Tuple[int, int], ...]:
+    if type(element) is str:
+        return ((ord(element), ord(element)),) if len(element) == 1 else ()
+    if type(element) is frozenset:
+        return tuple((ord(_), ord(_)) for _ in element if type(_) is str and len(_) == 1)
+    if type(element) is IntervalSet:
+        return element.intervals
+    return ()
+
+
+def partition(elements: Iterable[KeyType]) -> Alphabet:
+    """Alphabet: Returns the coarsest alphabet where two elements share a class only if every transition element
+        matches both of them or none of them."""
+    starts: Dict[int, List[KeyType]] = {}
+    ends: Dict[int, List[KeyType]] = {}
+    for element in set(elements):
+        for low, high in _intervals(element):
+            starts.setdefault(low, []).append(element)
+            ends.setdefault(high + 1, []).append(element)
+    boundaries = sorted(boundary for boundary in {*starts, *ends} if 0 < boundary <= MAXIMUM_CODE_POINT)
+    active = set(starts.get(0, ()))
+    signatures = {frozenset(active): 0}
+    interval_classes = [0]
+    for boundary in boundaries:
+        active.difference_update(ends.get(boundary, ()))
+        active.update(starts.get(boundary, ()))
+        interval_classes.append(signatures.setdefault(frozenset(active), len(signatures)))
+    return Alphabet(boundaries, interval_classes).remap(list(range(len(signatures))))
@@ -0,0 +1,211 @@
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+from RE.Alphabet import Alphabet
+from RE.FiniteStateMachine import FiniteStateMachine, KeyType, Symbol
+
+__all__ = (
+    "BitParallelFiniteStateMachine",
+)
+
+
+class BitParallelFiniteStateMachine:
+    """Bit-parallel simulation of a NFA.
+
+    The states of the NFA are numbered from 0 to state_count - 1 and a set of states is a single int, where bit i is
+    set if state i is in the set. The next states of every state for every class of the alphabet of the NFA (see
+    FiniteStateMachine.partition) are stored as a bitmask with the EPSILON closure already applied, and are combined 8
+    states at a time: for a block of 8 states and a class, the next states of each of the 256 subsets of the block are
+    computed the first time the block is used and kept, so a step costs one lookup and one OR per non-empty block
+    instead of one set operation per state.
+
+    Attributes:
+        alphabet (Alphabet): The class of every element.
+        state_count (int): Number of states.
+        class_count (int): Number of equivalence classes.
+        initial_states (int): Bitmask of the EPSILON closure of the initial states.
+        final_states (int): Bitmask of the final states.
+
+    Structures:
+        masks (list of list of int): The bitmask of the next states of each state, for each class.
+        blocks (list of list of list of int): The bitmask of the next states of each subset of each block of 8 states,
+            for each class (None until the block is used).
+
+    Examples:
+        >>> from RE.RegularExpression.Literal import Literal
+        >>> from RE.RegularExpression.Quantification import Quantification
+        >>> from RE.RegularExpression.Wildcard import Wildcard
+        >>> from RE.RegularExpression.Zero import Zero
+        >>> expression = Zero(Wildcard()) + Literal("a") + Quantification(Literal("a") | Literal("b"), exact=20)
+        >>> expression.compile(mode="bitset")
+        >>> print(expression.engine.accepts(input("> ")))
+    """
+
+    alphabet: Alphabet
+    state_count: int
+    class_count: int
+    initial_states: int
+    final_states: int
+    masks: List[List[int]]
+    blocks: List[List[Optional[List[int]]]]
+
+    def __init__(self, finite_state_machine: FiniteStateMachine):
+        super().__init__()
+        state_list = sorted(finite_state_machine.state_set)
+        index = {state: i for i, state in enumerate(state_list)}
+        closures: Dict[int, int] = {}
+
+        def _mask(states: FrozenSet[int]) -> int:
+            mask = 0
+            for state in states:
+                if state not in closures:
+                    closures[state] = 0
+                    for to_state in finite_state_machine.closure({state}):
+                        closures[state] |= 1 << index[to_state]
+                mask |= closures[state]
+            return mask
+
+        self.alphabet = finite_state_machine.partition()
+        self.state_count = len(state_list)
+        self.class_count = self.alphabet.class_count
+        self.initial_states = _mask(finite_state_machine.initial_states)
+        self.final_states = sum(1 << index[state] for state in finite_state_machine.final_states)
+        self.masks = [[0] * self.state_count for _ in range(self.class_count)]
+        element_classes: Dict[KeyType, FrozenSet[int]] = {}
+        for state in state_list:
+            for element_class, to_states in finite_state_machine.moves(
+                    {state},
+                    self.alphabet,
+                    element_classes
+            ).items():
+                self.masks[element_class][index[state]] = _mask(to_states)
+        self.blocks = [[None] * ((self.state_count + 7) >> 3) for _ in range(self.class_count)]
+
+    def __call__(self, string: str) -> Iterator[Tuple[KeyType, int]]:
+        return self.run(string)
+
+    def _block(self, element_class: int, block: int) -> List[int]:
+        masks = self.masks[element_class][block << 3:(block + 1) << 3]
+        block_masks = [0] * 256
+        for subset in range(1, 1 << len(masks)):
+            low = subset & -subset
+            block_masks[subset] = block_masks[subset ^ low] | masks[low.bit_length() - 1]
+        self.blocks[element_class][block] = block_masks
+        return block_masks
+
+    def _step(self, states: int, element_class: int) -> int:
+        blocks = self.blocks[element_class]
+        data = states.to_bytes(len(blocks), "little")
+        new_states = 0
+        for block in range(((states & -states).bit_length() - 1) >> 3, (states.bit_length() + 7) >> 3):
+            subset = data[block]
+            if subset:
+                block_masks = blocks[block]
+                if block_masks is None:
+                    block_masks = self._block(element_class, block)
+                new_states |= block_masks[subset]
+        return new_states
+
+    def step(
+            self,
+            states: int,
+            element: str
+    ) -> int:
+        """int: Returns the bitmask of the next states of the states (a bitmask) for the element."""
+        return self._step(states, self.alphabet[element]) if states else 0
+
+    def run(
+            self,
+            string: str
+    ) -> Iterator[Tuple[KeyType, int]]:
+        """iter of tuple of str and int: Iterates the str through the NFA (the states are bitmasks)."""
+        current_states = self.initial_states
+        for element in string:
+            current_states = self.step(current_states, element)
+            yield element, current_states
+            if not current_states:
+                return
+        yield Symbol.EOF, current_states
+
+    def last(
+            self,
+            string: str
+    ) -> int:
+        """int: Returns the bitmask of the last states of iterating the str through the NFA."""
+        step = self._step
+        alphabet = self.alphabet
+        current_states = self.initial_states
+        for element in string:
+            if not current_states:
+                break
+            current_states = step(current_states, alphabet[element])
+        return current_states
+
+    def accepts(
+            self,
+            string: str
+    ) -> bool:
+        """bool: Returns True if the at least one of the last states is a final states after iterating the str through
+            the NFA."""
+        return bool(self.last(string) & self.final_states)
+
+    def longest(
+            self,
+            string: str,
+            start: int = 0,
+            end: int = None
+    ) -> Optional[int]:
+        """int: Returns the end of the longest non-empty prefix of string[start:end] accepted by the NFA, None if there
+            is none. The str is iterated once and the iteration stops as soon as there are no current states."""
+        end = len(string) if end is None else end
+        step = self._step
+        alphabet = self.alphabet
+        final_states = self.final_states
+        current_states = self.initial_states
+        last_position = None
+        for position in range(start, end):
+            if not current_states:
+                break
+            current_states = step(current_states, alphabet[string[position]])
+            if current_states & final_states:
+                last_position = position + 1
+        return last_position
+
+    def search(
+            self,
+            string: str,
+            start: int = 0,
+            end: int = None
+    ) -> Optional[Tuple[int, int]]:
+        """tuple of int and int: Returns the start and the end of the leftmost-longest non-empty substring of
+            string[start:end] accepted by the NFA, None if there is none (see FiniteStateMachine.search)."""
+        end = len(string) if end is None else end
+        step = self._step
+        alphabet = self.alphabet
+        final_states = self.final_states
+        threads: List[Tuple[int, int]] = []
+        match_start = match_end = None
+        for position in range(start, end):
+            if match_start is None:
+                new_states = self.initial_states
+                for _, current_states in threads:
+                    new_states &= ~current_states
+                if new_states:
+                    threads.append((position, new_states))
+            element_class = alphabet[string[position]]
+            new_threads = []
+            seen_states = 0
+            for thread_start, current_states in threads:
+                if match_start is not None and thread_start > match_start:
+                    break
+                current_states = step(current_states, element_class) & ~seen_states
+                if not current_states:
+                    continue
+                seen_states |= current_states
+                new_threads.append((thread_start, current_states))
+                if current_states & final_states and (match_start is None or thread_start <= match_start):
+                    match_start, match_end = thread_start, position + 1
+            threads = new_threads
+            if match_start is not None and not threads:
+                break
+        if match_start is not None:
+            return match_start, match_end
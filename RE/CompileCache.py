@@ -0,0 +1,110 @@
+from collections import OrderedDict
+from typing import Any, Optional
+
+__all__ = (
+    "CompileCache",
+)
+
+
+class CompileCache:
+    """Cache of compiled automata, keyed by the fingerprint of what they were compiled from.
+
+    The entries are kept in memory (the least recently used ones are dropped when there are more than size entries)
+    and, if a directory is given, pickled to a file of the directory, so other processes (and later runs) find them
+    without compiling anything.
+
+    Attributes:
+        directory (str): The directory of the on-disk cache, None to keep the entries in memory only.
+        size (int): The maximum number of entries kept in memory.
+        hits (int): Number of entries found in memory or on disk.
+        misses (int): Number of entries that weren't found.
+
+    Examples:
+        >>> from RE.CompileCache import CompileCache
+        >>> from RE.RegularExpression.Expression import Expression
+        >>> from RE.RegularExpression.Literal import Literal
+        >>> Expression.cache = CompileCache("expressions")
+        >>> expression = Literal("0") | Literal("1")
+        >>> expression.compile(mode="table")
+        >>> print(Expression.cache.hits, Expression.cache.misses)
+    """
+
+    directory: Optional[str]
+    size: int
+    hits: int
+    misses: int
+
+    def __init__(self, directory: str = None, size: int = 128):
+        super().__init__()
+        assert size > 0
+        self.directory = directory
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        if directory is not None:
+            from os import makedirs
+            makedirs(directory, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def _path(self, key: str) -> str:
+        from os.path import join
+        return join(self.directory, f"{key}.pickle")
+
+    def _remember(self, key: str, value: Any):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the entry of the key, None if there is none."""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        if self.directory is not None:
+            from pickle import load
+            try:
+                with open(self._path(key), "rb") as file:
+                    value = load(file)
+            except Exception:
+                pass
+            else:
+                self._remember(key, value)
+                self.hits += 1
+                return value
+        self.misses += 1
+        return None
+
+    def put(self, key: str, value: Any):
+        """Adds an entry to the cache (and writes it to the directory, unless it can't be written or pickled: the
+            entry is then only kept in memory)."""
+        self._remember(key, value)
+        if self.directory is not None:
+            from os import getpid, remove, replace
+            from os.path import exists
+            from pickle import dump, HIGHEST_PROTOCOL, PicklingError
+            path = self._path(key)
+            temporary_path = f"{path}.{getpid()}"
+            try:
+                with open(temporary_path, "wb") as file:
+                    dump(value, file, HIGHEST_PROTOCOL)
+                replace(temporary_path, path)
+            except (OSError, PicklingError, TypeError, AttributeError):
+                pass
+            finally:
+                if exists(temporary_path):
+                    try:
+                        remove(temporary_path)
+                    except OSError:
+                        pass
+
+    def clear(self):
+        """Empties the cache in memory (the files of the directory are kept)."""
+        self._entries.clear()
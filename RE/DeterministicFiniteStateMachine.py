@@ -0,0 +1,317 @@
+from array import array
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from RE.Alphabet import Alphabet
+from RE.FiniteStateMachine import KeyType, Symbol
+
+__all__ = (
+    "DeterministicFiniteStateMachine",
+)
+
+
+class DeterministicFiniteStateMachine:
+    """Deterministic Finite State Machine implementation.
+
+    The elements are grouped in the equivalence classes of an Alphabet and every state has at most one next state for
+    a given class, so iterating a str through the DFA costs a couple of lookups per character. Instances are usually
+    created with RE.FiniteStateMachine.FiniteStateMachine.determinize.
+
+    Attributes:
+        alphabet (Alphabet): The class of every element.
+        initial_state (int): Initial state of the DFA.
+        final_states (set of int): Final states of the DFA: the DFA will accept a sequence of ElementType if the last
+            state is contained in this set.
+
+    Structures:
+        transitions (dict of int and dict of int and int): The next state of a state for each class.
+        tags (dict of int and int): The tag of the final states (e.g. the rule of a Lexer that they accept), 0 if
+            missing.
+
+    Examples:
+        >>> from RE.RegularExpression.Literal import Literal
+        >>> expression = Literal("0") | Literal("1")
+        >>> expression.compile(mode="dfa")
+        >>> print(expression.engine.accepts(input("> ")))
+    """
+
+    alphabet: Alphabet
+    initial_state: int
+    final_states: Set[int]
+    transitions: Dict[int, Dict[int, int]]
+    tags: Dict[int, int]
+
+    def __init__(
+            self,
+            alphabet: Alphabet,
+            initial_state: int = 0,
+            final_states: Set[int] = None
+    ):
+        super().__init__()
+        self.alphabet = alphabet
+        self.initial_state = initial_state
+        self.final_states = set() if final_states is None else final_states
+        self.transitions = {}
+        self.tags = {}
+
+    def __contains__(self, state: int) -> bool:
+        return state in self.state_set
+
+    def __call__(self, string: str) -> Iterator[Tuple[KeyType, Optional[int]]]:
+        return self.run(string)
+
+    @property
+    def state_set(self) -> Set[int]:
+        """set of int: All the states used in the DFA."""
+        state_set = {self.initial_state, *self.final_states, *self.transitions}
+        for transitions in self.transitions.values():
+            state_set.update(transitions.values())
+        return state_set
+
+    def add_final_states(
+            self,
+            final_states: Set[int]
+    ):
+        """Adds states to the final states of the DFA."""
+        self.final_states.update(final_states)
+
+    def remove_final_states(
+            self,
+            final_states: Set[int] = None
+    ):
+        """Removes states from the final states of the DFA."""
+        if final_states is None:
+            self.final_states.clear()
+        else:
+            self.final_states.difference_update(final_states)
+
+    def add_transition(
+            self,
+            element_class: int,
+            from_state: int,
+            to_state: int
+    ):
+        """Adds a transition to the DFA."""
+        if from_state in self.transitions:
+            self.transitions[from_state][element_class] = to_state
+        else:
+            self.transitions[from_state] = {element_class: to_state}
+
+    def minimize(self) -> "DeterministicFiniteStateMachine":
+        """DeterministicFiniteStateMachine: Returns the equivalent DFA with the fewest states.
+
+        Equivalent states are merged with Hopcroft's partition refinement, states that can't reach a final state are
+        dropped (the DFA gets stuck instead) and the states are renumbered from 0 (the initial state) to n - 1. Final
+        states with different tags are never merged.
+        """
+        state_list = sorted(self.state_set)
+        sink = len(state_list)
+        index = {state: i for i, state in enumerate(state_list)}
+        symbols = range(self.alphabet.class_count)
+
+        def _next(state: int, element_class: int) -> int:
+            transitions = self.transitions.get(state, {})
+            return index[transitions[element_class]] if element_class in transitions else sink
+
+        inverse: List[Dict[int, Set[int]]] = [{} for _ in symbols]
+        for state in state_list:
+            for element_class in symbols:
+                inverse[element_class].setdefault(_next(state, element_class), set()).add(index[state])
+        for element_class in symbols:
+            inverse[element_class].setdefault(sink, set()).add(sink)
+
+        final_block = {index[state] for state in self.final_states if state in index}
+        tag_blocks: Dict[int, Set[int]] = {}
+        for state in final_block:
+            tag_blocks.setdefault(self.tags.get(state_list[state], 0), set()).add(state)
+        live_block = set(final_block)
+        pending_states = list(final_block)
+        while pending_states:
+            to_state = pending_states.pop()
+            for element_class in symbols:
+                for from_state in inverse[element_class].get(to_state, ()):
+                    if from_state not in live_block:
+                        live_block.add(from_state)
+                        pending_states.append(from_state)
+        dead_block = set(range(sink + 1)) - live_block
+        blocks = [block for block in (*tag_blocks.values(), live_block - final_block, dead_block) if block]
+        block_of = {}
+        for i, block in enumerate(blocks):
+            for state in block:
+                block_of[state] = i
+        pending = set(range(len(blocks)))
+        while pending:
+            splitter = set(blocks[pending.pop()])
+            for element_class in symbols:
+                from_states = set()
+                for state in splitter:
+                    from_states.update(inverse[element_class].get(state, ()))
+                touched: Dict[int, Set[int]] = {}
+                for state in from_states:
+                    touched.setdefault(block_of[state], set()).add(state)
+                for i, states in touched.items():
+                    if len(states) == len(blocks[i]):
+                        continue
+                    split = states if len(states) <= len(blocks[i]) - len(states) else blocks[i] - states
+                    blocks[i] -= split
+                    blocks.append(split)
+                    for state in split:
+                        block_of[state] = len(blocks) - 1
+                    pending.add(len(blocks) - 1)
+        live = {block_of[state] for state in live_block}
+
+        deterministic_finite_state_machine = DeterministicFiniteStateMachine(self.alphabet, 0)
+        initial_block = block_of[index[self.initial_state]]
+        if initial_block not in live:
+            return deterministic_finite_state_machine
+        numbers = {initial_block: 0}
+        pending_blocks = [initial_block]
+        while pending_blocks:
+            block = pending_blocks.pop(0)
+            from_state = numbers[block]
+            representative = state_list[next(iter(blocks[block]))]
+            if representative in self.final_states:
+                deterministic_finite_state_machine.add_final_states({from_state})
+                if representative in self.tags:
+                    deterministic_finite_state_machine.tags[from_state] = self.tags[representative]
+            for element_class in symbols:
+                to_block = block_of[_next(representative, element_class)]
+                if to_block not in live:
+                    continue
+                if to_block not in numbers:
+                    numbers[to_block] = len(numbers)
+                    pending_blocks.append(to_block)
+                deterministic_finite_state_machine.add_transition(element_class, from_state, numbers[to_block])
+        return deterministic_finite_state_machine
+
+    def tabulate(self) -> "TransitionTable":
+        """TransitionTable: Returns the array-backed representation of the DFA, where the classes that lead every
+            state to the same next state are merged."""
+        from RE.TransitionTable import TransitionTable
+
+        state_list = sorted(self.state_set)
+        index = {state: i for i, state in enumerate(state_list)}
+        columns: Dict[Tuple[int, ...], int] = {}
+        classes = []
+        for element_class in range(self.alphabet.class_count):
+            column = tuple(
+                index[self.transitions[state][element_class]]
+                if element_class in self.transitions.get(state, {})
+                else -1
+                for state in state_list
+            )
+            classes.append(columns.setdefault(column, len(columns)))
+        class_count = len(columns)
+        table = array("i", [-1]) * (len(state_list) * class_count)
+        for column, element_class in columns.items():
+            for i, to_state in enumerate(column):
+                table[i * class_count + element_class] = to_state
+        final_states = bytearray(state in self.final_states for state in state_list)
+        tags = array("i", (self.tags.get(state, 0) if state in self.final_states else -1 for state in state_list))
+        return TransitionTable(self.alphabet.remap(classes), table, final_states, index[self.initial_state], tags)
+
+    def step(
+            self,
+            state: int,
+            element: str
+    ) -> Optional[int]:
+        """int: Returns the next state of the state for the element, None if there is none."""
+        return self.transitions.get(state, {}).get(self.alphabet[element])
+
+    def run(
+            self,
+            string: str
+    ) -> Iterator[Tuple[KeyType, Optional[int]]]:
+        """iter of tuple of str and int: Iterates the str through the DFA."""
+        transitions = self.transitions
+        alphabet = self.alphabet
+        state = self.initial_state
+        for element in string:
+            connections = transitions.get(state)
+            state = None if connections is None else connections.get(alphabet[element])
+            yield element, state
+            if state is None:
+                return
+        yield Symbol.EOF, state
+
+    def last(
+            self,
+            string: str
+    ) -> Optional[int]:
+        """int: Returns the last state of iterating the str through the DFA, None if the DFA got stuck."""
+        last_state = None
+        for element, last_state in self.run(string):
+            pass
+        return last_state
+
+    def accepts(
+            self,
+            string: str
+    ) -> bool:
+        """bool: Returns True if the last state is a final state after iterating the str through the DFA."""
+        return self.last(string) in self.final_states
+
+    def longest(
+            self,
+            string: str,
+            start: int = 0,
+            end: int = None
+    ) -> Optional[int]:
+        """int: Returns the end of the longest non-empty prefix of string[start:end] accepted by the DFA, None if there
+            is none. The str is iterated once and the iteration stops as soon as the DFA gets stuck."""
+        end = len(string) if end is None else end
+        transitions = self.transitions
+        alphabet = self.alphabet
+        final_states = self.final_states
+        state = self.initial_state
+        last_position = None
+        for position in range(start, end):
+            connections = transitions.get(state)
+            if connections is None:
+                break
+            state = connections.get(alphabet[string[position]])
+            if state is None:
+                break
+            if state in final_states:
+                last_position = position + 1
+        return last_position
+
+    def search(
+            self,
+            string: str,
+            start: int = 0,
+            end: int = None
+    ) -> Optional[Tuple[int, int]]:
+        """tuple of int and int: Returns the start and the end of the leftmost-longest non-empty substring of
+            string[start:end] accepted by the DFA, None if there is none.
+
+        The str is iterated once, as if the DFA had an implicit SIGMA loop before its initial state: every position
+        adds a new thread and every state is kept only by the thread that started first.
+        """
+        end = len(string) if end is None else end
+        transitions = self.transitions
+        alphabet = self.alphabet
+        final_states = self.final_states
+        threads: List[Tuple[int, int]] = []
+        match_start = match_end = None
+        for position in range(start, end):
+            if match_start is None and all(state != self.initial_state for _, state in threads):
+                threads.append((position, self.initial_state))
+            element_class = alphabet[string[position]]
+            new_threads = []
+            seen_states = set()
+            for thread_start, state in threads:
+                if match_start is not None and thread_start > match_start:
+                    break
+                connections = transitions.get(state)
+                state = None if connections is None else connections.get(element_class)
+                if state is None or state in seen_states:
+                    continue
+                seen_states.add(state)
+                new_threads.append((thread_start, state))
+                if state in final_states and (match_start is None or thread_start <= match_start):
+                    match_start, match_end = thread_start, position + 1
+            threads = new_threads
+            if match_start is not None and not threads:
+                break
+        if match_start is not None:
+            return match_start, match_end
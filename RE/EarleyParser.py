@@ -0,0 +1,287 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from RE.Lexer import Token
+from RE.Parser import Branch
+
+__all__ = (
+    "ForestNode",
+    "EarleyParser"
+)
+
+LabelType = Union[str, Tuple[int, int]]
+ItemType = Tuple[int, int, int, Optional["ForestNode"]]
+
+
+class ForestNode:
+    """Node of a shared packed parse forest (SPPF).
+
+    A symbol node (labelled by a name) stands for every derivation of the name over tokens[start:end]; an
+    intermediate node (labelled by a production and a dot) stands for every derivation of the first dot symbols of the
+    production over tokens[start:end]. Every family is one way to derive the node: a tuple of ForestNode and Token
+    (intermediate nodes always come first). The forest is binarized, so it takes at most cubic space in the number of
+    tokens whatever the number of trees it shares.
+
+    Attributes:
+        label (str or tuple of int and int): The name, or the production and the dot of an intermediate node.
+        start (int): Index of the first token derived.
+        end (int): Index of the token after the last token derived.
+        families (list of tuple of ForestNode and Token): The alternative children of the node: there is more than one
+            if the derivation is ambiguous.
+    """
+
+    __slots__ = ("label", "start", "end", "families", "_families")
+
+    label: LabelType
+    start: int
+    end: int
+    families: List[Tuple[Union["ForestNode", Token], ...]]
+
+    def __init__(self, label: LabelType, start: int, end: int):
+        self.label = label
+        self.start = start
+        self.end = end
+        self.families = []
+        self._families = set()
+
+    def __repr__(self) -> str:
+        return f"ForestNode({self.label!r}, {self.start}, {self.end})"
+
+    @property
+    def intermediate(self) -> bool:
+        """bool: True if the node is an intermediate node."""
+        return type(self.label) is tuple
+
+    @property
+    def ambiguous(self) -> bool:
+        """bool: True if there is more than one way to derive the node."""
+        return len(self.families) > 1
+
+    def add_family(self, family: Tuple[Union["ForestNode", Token], ...]):
+        """Adds a family to the node, unless it already has it."""
+        if family not in self._families:
+            self._families.add(family)
+            self.families.append(family)
+
+    def _postorder(self) -> List["ForestNode"]:
+        """list of ForestNode: Returns the nodes of the forest, every node after its children (walked with an explicit
+            stack, so the depth of the forest is not limited by the recursion limit)."""
+        order = []
+        done: Set[int] = set()
+        expanded: Set[int] = set()
+        stack: List[ForestNode] = [self]
+        while stack:
+            node = stack[-1]
+            if id(node) in done:
+                stack.pop()
+                continue
+            children = [
+                child
+                for family in node.families
+                for child in family
+                if isinstance(child, ForestNode) and id(child) not in done
+            ]
+            if children:
+                if id(node) in expanded:
+                    raise Exception(f"Cyclic forest: {node}")
+                expanded.add(id(node))
+                stack += children
+                continue
+            stack.pop()
+            done.add(id(node))
+            order.append(node)
+        return order
+
+    def count(self) -> int:
+        """int: Returns the number of trees in the forest (the forest of a cyclic grammar must not be cyclic)."""
+        counts: Dict[int, int] = {}
+        for node in self._postorder():
+            total = 0
+            for family in node.families:
+                product = 1
+                for child in family:
+                    if isinstance(child, ForestNode):
+                        product *= counts[id(child)]
+                total += product
+            counts[id(node)] = total
+        return counts[id(self)]
+
+    def trees(self) -> Iterator[Branch]:
+        """iter of Branch: Yields every tree in the forest of a symbol node (beware: there can be exponentially many,
+            and they are all built before the first one is yielded)."""
+        assert not self.intermediate
+        expansions: Dict[int, List[list]] = {}
+        for node in self._postorder():
+            expansion = []
+            for family in node.families:
+                alternatives: List[list] = [[]]
+                for child in family:
+                    if isinstance(child, Token):
+                        options = [[child]]
+                    elif child.intermediate:
+                        options = expansions[id(child)]
+                    else:
+                        options = [[tree] for tree in expansions[id(child)]]
+                    alternatives = [children + option for children in alternatives for option in options]
+                expansion += alternatives
+            expansions[id(node)] = (
+                expansion if node.intermediate else [Branch(node.label, children) for children in expansion]
+            )
+        yield from expansions[id(self)]
+
+
+class EarleyParser:
+    """Earley Parser implementation.
+
+    The sentences define a context-free grammar like in RE.Parser.Parser, but the grammar can be ambiguous: instead of
+    a single tree, EarleyParser.parse returns a shared packed parse forest built with Scott's algorithm (SPPF-style
+    parsing from Earley recognisers). The parse takes cubic time in the worst case, quadratic time on unambiguous
+    grammars and linear time on most of the left-recursive LR grammars.
+
+    Attributes:
+        sentences (dict of str and list of list of str): The sentences (right-hand sides) of each name.
+
+    Structures:
+        productions (list of tuple of str and tuple of str): The sentences, numbered.
+
+    Examples:
+        >>> from RE.Lexer import Token
+        >>> from RE.EarleyParser import EarleyParser
+        >>> parser = EarleyParser(expression=[["number"], ["expression", "plus", "expression"]])
+        >>> forest = parser.parse([Token("number", "1"), Token("plus", "+")] * 2 + [Token("number", "3")])
+        >>> print(forest.count(), list(forest.trees()))
+    """
+
+    sentences: Dict[str, List[List[str]]]
+    productions: List[Tuple[str, Tuple[str, ...]]]
+
+    def __init__(self, **sentences):
+        self.sentences = {**sentences}
+        self.productions = []
+
+    def __contains__(self, name: str) -> bool:
+        return self.has_sentence(name)
+
+    def __setitem__(self, name: str, sentences: List[List[str]]):
+        self.add_sentence(name, sentences)
+
+    def __getitem__(self, name: str) -> List[List[str]]:
+        return self.get_sentence(name)
+
+    def __delitem__(self, name: str):
+        self.remove_sentence(name)
+
+    def __call__(self, tokens: Iterable[Token]) -> ForestNode:
+        return self.parse(tokens)
+
+    def has_sentence(self, name: str) -> bool:
+        return name in self.sentences
+
+    def add_sentence(self, name: str, sentences: List[List[str]]):
+        self.sentences[name] = sentences
+
+    def get_sentence(self, name: str) -> List[List[str]]:
+        return self.sentences[name]
+
+    def remove_sentence(self, name: str):
+        del self.sentences[name]
+
+    def parse(self, tokens: Iterable[Token]) -> ForestNode:
+        """ForestNode: Returns the symbol node of the start of the grammar (the first name defined) over all the
+            tokens."""
+        assert self.sentences
+        tokens = list(tokens)
+        sentences = self.sentences
+        self.productions = productions = [
+            (name, tuple(sentence))
+            for name, _sentences in sentences.items()
+            for sentence in _sentences
+        ]
+        productions_of: Dict[str, List[int]] = {}
+        for production, (name, _) in enumerate(productions):
+            productions_of.setdefault(name, []).append(production)
+        start = next(iter(sentences))
+
+        def _next(production: int, dot: int) -> Optional[str]:
+            sentence = productions[production][1]
+            return sentence[dot] if dot < len(sentence) else None
+
+        def _make_node(
+                production: int,
+                dot: int,
+                origin: int,
+                end: int,
+                left: Optional[ForestNode],
+                right: Union[ForestNode, Token],
+                nodes: Dict[Tuple[LabelType, int], ForestNode]
+        ) -> Union[ForestNode, Token]:
+            name, sentence = productions[production]
+            label = name if dot == len(sentence) else (production, dot)
+            if dot == 1 and dot < len(sentence):
+                return right
+            node = nodes.get((label, origin))
+            if node is None:
+                node = nodes[label, origin] = ForestNode(label, origin, end)
+            node.add_family((right,) if left is None else (left, right))
+            return node
+
+        def _add(item: ItemType, item_set: Set[ItemType], pending: List[ItemType], scanned: List[ItemType], i: int):
+            symbol = _next(item[0], item[1])
+            if symbol is None or symbol in sentences:
+                if item not in item_set:
+                    item_set.add(item)
+                    pending.append(item)
+            elif i < len(tokens) and symbol == tokens[i].name and item not in item_set:
+                item_set.add(item)
+                scanned.append(item)
+
+        item_set: Set[ItemType] = set()
+        pending: List[ItemType] = []
+        scanned: List[ItemType] = []
+        for production in productions_of.get(start, ()):
+            _add((production, 0, 0, None), item_set, pending, scanned, 0)
+        waiting: List[Dict[str, List[ItemType]]] = []
+        # The nodes that end at i, shared by the scan into i and the completions at i.
+        nodes: Dict[Tuple[LabelType, int], ForestNode] = {}
+        for i in range(len(tokens) + 1):
+            waiting.append({})
+            completed: Dict[str, ForestNode] = {}
+            while pending:
+                item = pending.pop()
+                production, dot, origin, node = item
+                symbol = _next(production, dot)
+                if symbol is not None:
+                    waiting[i].setdefault(symbol, []).append(item)
+                    for _production in productions_of[symbol]:
+                        _add((_production, 0, i, None), item_set, pending, scanned, i)
+                    if symbol in completed:
+                        _node = _make_node(production, dot + 1, origin, i, node, completed[symbol], nodes)
+                        _add((production, dot + 1, origin, _node), item_set, pending, scanned, i)
+                    continue
+                name = productions[production][0]
+                if node is None:
+                    node = nodes.get((name, i))
+                    if node is None:
+                        node = nodes[name, i] = ForestNode(name, i, i)
+                    node.add_family(())
+                if origin == i:
+                    completed[name] = node
+                for _production, _dot, _origin, _node in list(waiting[origin].get(name, ())):
+                    _node = _make_node(_production, _dot + 1, _origin, i, _node, node, nodes)
+                    _add((_production, _dot + 1, _origin, _node), item_set, pending, scanned, i)
+            if i == len(tokens):
+                break
+            if not scanned:
+                raise Exception(f"Unexpected token: {tokens[i]}")
+            item_set = set()
+            nodes = {}
+            scanned_items = scanned
+            scanned = []
+            for production, dot, origin, node in scanned_items:
+                _node = _make_node(production, dot + 1, origin, i + 1, node, tokens[i], nodes)
+                _add((production, dot + 1, origin, _node), item_set, pending, scanned, i + 1)
+
+        for production, dot, origin, node in item_set:
+            name, sentence = productions[production]
+            if name == start and origin == 0 and dot == len(sentence):
+                return nodes[start, 0] if node is None else node
+        raise Exception("Unexpected end of tokens")
@@ -1,14 +1,17 @@
 # TODO: Deprecate usage of RE.FiniteStateMachine.Symbol.SIGMA
 
+from array import array
 from enum import Enum, auto
-from typing import Dict, Iterator, Set, Tuple, FrozenSet, Union
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, FrozenSet, Union
+
+from RE.IntervalSet import IntervalSet
 
 __all__ = (
     "Symbol",
     "FiniteStateMachine"
 )
 
-KeyType = Union["Symbol", str, FrozenSet[str]]
+KeyType = Union["Symbol", str, FrozenSet[str], IntervalSet]
 ConnectionsType = Dict[KeyType, FrozenSet[int]]
 
 
@@ -31,13 +34,18 @@ class FiniteStateMachine:
         of the last states is contained in this set.
 
     Structures:
-        connections (dict of KeyType and Set of int):
-        transitions (set of int)
+        transitions (dict of KeyType and dict of int and set of int): The next states of each state, by element.
+        connections (dict of int and dict of KeyType and set of int): Index of transitions by state, kept up to date
+            with them (both structures share the sets of next states).
+        wildcard_connections (dict of int and list of tuple of KeyType and set of int): The SIGMA, frozenset and
+            IntervalSet connections of each state, which can't be looked up by element.
     """
 
     initial_states: Set[int]
     final_states: Set[int]
     transitions: Dict[KeyType, Dict[int, Set[int]]]
+    connections: Dict[int, Dict[KeyType, Set[int]]]
+    wildcard_connections: Dict[int, List[Tuple[KeyType, Set[int]]]]
 
     def __init__(
             self,
@@ -48,6 +56,8 @@ class FiniteStateMachine:
         self.initial_states = set() if initial_states is None else initial_states
         self.final_states = set() if final_states is None else final_states
         self.transitions = {}
+        self.connections = {}
+        self.wildcard_connections = {}
 
     def __contains__(self, state: int) -> bool:
         return state in self.state_set
@@ -136,12 +146,16 @@ class FiniteStateMachine:
             to_states: Set[int]
     ):
         """Adds a transition to the FSM."""
-        if self.has_transition(element, from_state):
-            self.transitions[element][from_state].update(to_states)
-        elif element in self.input_set:
-            self.transitions[element][from_state] = to_states
-        else:
-            self.transitions[element] = {from_state: to_states}
+        transitions = self.transitions.get(element)
+        if transitions is None:
+            transitions = self.transitions[element] = {}
+        elif from_state in transitions:
+            transitions[from_state].update(to_states)
+            return
+        transitions[from_state] = to_states
+        self.connections.setdefault(from_state, {})[element] = to_states
+        if element is Symbol.SIGMA or type(element) in (frozenset, IntervalSet):
+            self.wildcard_connections.setdefault(from_state, []).append((element, to_states))
 
     def get_transition(
             self,
@@ -162,6 +176,13 @@ class FiniteStateMachine:
         assert self.has_transition(element, from_state, to_states)
         if to_states is None:
             del self.transitions[element][from_state]
+            del self.connections[from_state][element]
+            if from_state in self.wildcard_connections:
+                self.wildcard_connections[from_state] = [
+                    (_, _to_states)
+                    for _, _to_states in self.wildcard_connections[from_state]
+                    if _ != element
+                ]
         else:
             self.transitions[element][from_state].difference_update(to_states)
 
@@ -180,12 +201,10 @@ class FiniteStateMachine:
     ) -> ConnectionsType:
         """ConnectionsType: Returns the connections of a state in the FSM."""
         assert state in self.state_set
-        connections = {}
-        for element, transition in self.transitions.items():
-            for from_state, to_states in transition.items():
-                if state == from_state:
-                    connections[element] = frozenset(to_states)
-        return connections
+        return {
+            element: frozenset(to_states)
+            for element, to_states in self.connections.get(state, {}).items()
+        }
 
     def remove_connections(
             self,
@@ -194,63 +213,69 @@ class FiniteStateMachine:
         """Removes a state and its connections from the FSM."""
         assert state in self.state_set
         for element in self.transitions:
-            for from_state, to_states in self.transitions[element].items():
-                if state in to_states:
-                    self.remove_transition(element, from_state, {state})
+            for from_state, to_states in list(self.transitions[element].items()):
+                to_states.discard(state)
                 if from_state == state:
-                    del self.transitions[element][state]
-                pointer = self.transitions[element]
-                if not pointer:
-                    del pointer
+                    self.remove_transition(element, state)
+
+    def closure(
+            self,
+            states: Set[int]
+    ) -> Set[int]:
+        """set of int: Adds to the states (in place) every state reachable from them through EPSILON transitions."""
+        connections = self.connections
+        pending = list(states)
+        while pending:
+            to_states = connections.get(pending.pop(), {}).get(Symbol.EPSILON)
+            if to_states:
+                for to_state in to_states:
+                    if to_state not in states:
+                        states.add(to_state)
+                        pending.append(to_state)
+        return states
+
+    def step(
+            self,
+            states: Set[int],
+            element: str
+    ) -> Set[int]:
+        """set of int: Returns the EPSILON closure of the next states of the states for the element."""
+        connections = self.connections
+        wildcard_connections = self.wildcard_connections
+        new_states = set()
+        for state in states:
+            state_connections = connections.get(state)
+            if state_connections is None:
+                continue
+            to_states = state_connections.get(element)
+            if to_states:
+                new_states.update(to_states)
+            if state in wildcard_connections:
+                for element_set, to_states in wildcard_connections[state]:
+                    if element_set is Symbol.SIGMA or element in element_set:
+                        new_states.update(to_states)
+        return self.closure(new_states)
 
     def run(
             self,
             string: str
     ) -> Iterator[Tuple[KeyType, FrozenSet[int]]]:
         """iter of tuple of str and frozenset of int: Iterates the str through the FSM."""
-
-        def _current_states() -> Iterator[int]:
-            _state = current_states.pop() if current_states else None
-            while _state is not None:
-                yield _state
-                _state = current_states.pop() if current_states else None
-
-        current_states = self.initial_states.copy()
-        new_states = set()
-        for element in (*string, Symbol.EOF):
-            new_states = current_states.copy() if element is Symbol.EOF else new_states
-            for state in _current_states():
-                connections = self.get_connections(state)
-                if Symbol.EPSILON in connections:
-                    current_states.update(connections[Symbol.EPSILON] - {state})
-                    if element is Symbol.EOF:
-                        new_states.update(connections[Symbol.EPSILON])
-                if element is not Symbol.EOF:
-                    if Symbol.SIGMA in connections:
-                        new_states.update(connections[Symbol.SIGMA])
-                    if element in connections:
-                        new_states.update(connections[element])
-                    if any(type(_) is frozenset for _ in connections.keys()):
-                        for element_set in connections.keys():
-                            if type(element_set) is frozenset and element in element_set:
-                                new_states.update(connections[element_set])
-            if element is Symbol.EOF and not new_states:
-                break
-            current_states.update(new_states)
-            new_states.clear()
+        current_states = self.closure(set(self.initial_states))
+        for element in string:
+            current_states = self.step(current_states, element)
             yield element, frozenset(current_states)
             if not current_states:
-                break
+                return
+        if current_states:
+            yield Symbol.EOF, frozenset(current_states)
 
     def last(
             self,
             string: str
     ) -> FrozenSet[int]:
         """frozenset of int: Returns the last states of iterating the str through the FSM."""
-        last_states = None
-        for element, last_states in self.run(string):
-            pass
-        return last_states
+        return frozenset(self._last(string))
 
     def accepts(
             self,
@@ -258,4 +283,323 @@ class FiniteStateMachine:
     ) -> bool:
         """bool: Returns True if the at least one of the last states is a final states after iterating the str through
             the FSM. """
-        return bool(self.final_states & self.last(string))
+        return not self.final_states.isdisjoint(self._last(string))
+
+    def longest(
+            self,
+            string: str,
+            start: int = 0,
+            end: int = None
+    ) -> Optional[int]:
+        """int: Returns the end of the longest non-empty prefix of string[start:end] accepted by the FSM, None if there
+            is none. The str is iterated once and the iteration stops as soon as there are no current states."""
+        end = len(string) if end is None else end
+        final_states = self.final_states
+        current_states = self.closure(set(self.initial_states))
+        last_position = None
+        for position in range(start, end):
+            current_states = self.step(current_states, string[position])
+            if not current_states:
+                break
+            if not final_states.isdisjoint(current_states):
+                last_position = position + 1
+        return last_position
+
+    def search(
+            self,
+            string: str,
+            start: int = 0,
+            end: int = None
+    ) -> Optional[Tuple[int, int]]:
+        """tuple of int and int: Returns the start and the end of the leftmost-longest non-empty substring of
+            string[start:end] accepted by the FSM, None if there is none.
+
+        The str is iterated once, as if the FSM had an implicit SIGMA loop before its initial states: every position
+        adds a new thread and every state is kept only by the thread that started first. Threads are dropped once a
+        match that starts before them has been found.
+        """
+        end = len(string) if end is None else end
+        final_states = self.final_states
+        initial_states = self.closure(set(self.initial_states))
+        threads: List[Tuple[int, Set[int]]] = []
+        match_start = match_end = None
+        for position in range(start, end):
+            if match_start is None:
+                seen_states = initial_states.copy()
+                for _, current_states in threads:
+                    seen_states.difference_update(current_states)
+                if seen_states:
+                    threads.append((position, seen_states))
+            element = string[position]
+            new_threads = []
+            seen_states = set()
+            for thread_start, current_states in threads:
+                if match_start is not None and thread_start > match_start:
+                    break
+                current_states = self.step(current_states, element)
+                current_states.difference_update(seen_states)
+                if not current_states:
+                    continue
+                seen_states.update(current_states)
+                new_threads.append((thread_start, current_states))
+                if not final_states.isdisjoint(current_states) and (
+                        match_start is None or thread_start <= match_start
+                ):
+                    match_start, match_end = thread_start, position + 1
+            threads = new_threads
+            if match_start is not None and not threads:
+                break
+        if match_start is not None:
+            return match_start, match_end
+
+    def _last(
+            self,
+            string: str
+    ) -> Set[int]:
+        current_states = self.closure(set(self.initial_states))
+        for element in string:
+            if not current_states:
+                break
+            current_states = self.step(current_states, element)
+        return current_states
+
+    def partition(self) -> "Alphabet":
+        """Alphabet: Returns the equivalence classes of the elements: two elements share a class if every transition
+            element of the FSM matches both of them or none of them."""
+        from RE.Alphabet import partition
+        return partition(self.transitions)
+
+    def required_literal(self) -> Optional[Tuple[str, Optional[int]]]:
+        """tuple of str and int: Returns the longest literal that every accepted str contains, and the maximum number
+            of elements accepted before it (None if it is unbounded), None if there is no such literal.
+
+        The literal is read from the dominator tree of the FSM (with a sink after the final states): a state that is
+        only entered (other than through its own loops) from its immediate dominator and through a single element is
+        always entered through that element, and a run of such states without loops spells the literal.
+        """
+        state_set = self.state_set
+        if not state_set:
+            return None
+        root = min(state_set) - 1
+        sink = root - 1
+        successors: Dict[int, Set[int]] = {root: set(self.initial_states)}
+        incoming: Dict[int, List[Tuple[KeyType, int]]] = {sink: [(Symbol.EPSILON, state) for state in self.final_states]}
+        for state in self.initial_states:
+            incoming.setdefault(state, []).append((Symbol.EPSILON, root))
+        for state in self.final_states:
+            successors.setdefault(state, set()).add(sink)
+        for element, transitions in self.transitions.items():
+            for from_state, to_states in transitions.items():
+                for to_state in to_states:
+                    successors.setdefault(from_state, set()).add(to_state)
+                    incoming.setdefault(to_state, []).append((element, from_state))
+
+        postorder: Dict[int, int] = {}
+        visited = {root}
+        pending = [(root, iter(successors.get(root, ())))]
+        while pending:
+            state, to_states = pending[-1]
+            for to_state in to_states:
+                if to_state not in visited:
+                    visited.add(to_state)
+                    pending.append((to_state, iter(successors.get(to_state, ()))))
+                    break
+            else:
+                pending.pop()
+                postorder[state] = len(postorder)
+        if sink not in postorder:
+            return None
+
+        dominators = {root: root}
+
+        def _intersect(state: int, other_state: int) -> int:
+            while state != other_state:
+                while postorder[state] < postorder[other_state]:
+                    state = dominators[state]
+                while postorder[other_state] < postorder[state]:
+                    other_state = dominators[other_state]
+            return state
+
+        order = sorted(postorder, key=postorder.get, reverse=True)[1:]
+        changed = True
+        while changed:
+            changed = False
+            for state in order:
+                dominator = None
+                for _, from_state in incoming.get(state, ()):
+                    if from_state in dominators:
+                        dominator = from_state if dominator is None else _intersect(from_state, dominator)
+                if dominators.get(state) != dominator:
+                    dominators[state] = dominator
+                    changed = True
+
+        def _dominated(state: int, dominator: int) -> bool:
+            while state != dominator and state != root:
+                state = dominators[state]
+            return state == dominator
+
+        chain = [sink]
+        while chain[-1] != root:
+            chain.append(dominators[chain[-1]])
+        chain.reverse()
+        runs: List[Tuple[str, int]] = []
+        run = ""
+        for from_state, to_state in zip(chain, chain[1:]):
+            elements = {
+                element
+                for element, _from_state in incoming.get(to_state, ())
+                if _from_state in postorder and not _dominated(_from_state, to_state)
+            }
+            element = next(iter(elements)) if len(elements) == 1 else None
+            from_states = {_from_state for _, _from_state in incoming.get(to_state, ()) if _from_state in postorder}
+            loop = any(_dominated(_from_state, to_state) for _from_state in from_states)
+            if type(element) is str and len(element) == 1 and all(
+                    _from_state == from_state or _dominated(_from_state, to_state)
+                    for _from_state in from_states
+            ):
+                if not run:
+                    runs.append(("", from_state))
+                run += element
+                runs[-1] = run, runs[-1][1]
+            else:
+                run = ""
+            if loop:
+                run = ""
+        if not runs:
+            return None
+
+        lengths: Dict[int, Optional[int]] = {}
+
+        def _length(state: int, path: Set[int]) -> Optional[int]:
+            if state == root:
+                return 0
+            if state in path:
+                return None
+            if state not in lengths:
+                path.add(state)
+                length = 0
+                for element, from_state in incoming.get(state, ()):
+                    if from_state not in postorder:
+                        continue
+                    from_length = _length(from_state, path)
+                    if from_length is None:
+                        length = None
+                        break
+                    length = max(length, from_length + (element is not Symbol.EPSILON))
+                path.discard(state)
+                lengths[state] = length
+            return lengths[state]
+
+        return max(
+            ((literal, _length(state, set())) for literal, state in runs),
+            key=lambda required: (len(required[0]), required[1] is not None, -(required[1] or 0))
+        )
+
+    def moves(
+            self,
+            states: Set[int],
+            alphabet: "Alphabet",
+            element_classes: Dict[KeyType, FrozenSet[int]] = None
+    ) -> Dict[int, Set[int]]:
+        """dict of int and set of int: Returns the next states (without EPSILON closure) of the states for every class
+            of the alphabet that leads somewhere. element_classes caches the classes of each transition element."""
+        element_classes = {} if element_classes is None else element_classes
+        moves: Dict[int, Set[int]] = {}
+        for state in states:
+            for element, to_states in self.connections.get(state, {}).items():
+                if element is Symbol.EPSILON or not to_states:
+                    continue
+                if element not in element_classes:
+                    element_classes[element] = alphabet.classes_of(element)
+                for element_class in element_classes[element]:
+                    if element_class in moves:
+                        moves[element_class].update(to_states)
+                    else:
+                        moves[element_class] = set(to_states)
+        return moves
+
+    def determinize(
+            self,
+            tags: Dict[int, int] = None,
+            combine: Callable[[Iterable[int]], int] = min
+    ) -> "DeterministicFiniteStateMachine":
+        """DeterministicFiniteStateMachine: Returns an equivalent DFA built with the subset construction.
+
+        The transitions of the DFA are defined over the equivalence classes of FiniteStateMachine.partition, so a
+        SIGMA or an IntervalSet transition costs one transition per class instead of one per element. The EPSILON
+        closure of every state is computed once. If tags (a priority for the final states of the FSM, the lowest
+        winning) is given, every final state of the DFA is tagged with the lowest tag of the final states it contains,
+        or with combine of their tags if combine is given.
+        """
+        from RE.DeterministicFiniteStateMachine import DeterministicFiniteStateMachine
+
+        connections = self.connections
+        alphabet = self.partition()
+        element_classes: Dict[KeyType, FrozenSet[int]] = {}
+        closures: Dict[int, FrozenSet[int]] = {}
+
+        def _closure(states: Set[int]) -> FrozenSet[int]:
+            closure = set()
+            for state in states:
+                if state not in closures:
+                    state_closure = {state}
+                    pending = [state]
+                    while pending:
+                        for to_state in connections.get(pending.pop(), {}).get(Symbol.EPSILON, ()):
+                            if to_state not in state_closure:
+                                state_closure.add(to_state)
+                                pending.append(to_state)
+                    closures[state] = frozenset(state_closure)
+                closure.update(closures[state])
+            return frozenset(closure)
+
+        initial_states = _closure(self.initial_states)
+        deterministic_finite_state_machine = DeterministicFiniteStateMachine(alphabet, 0)
+        states = {initial_states: 0}
+        pending = [initial_states]
+        while pending:
+            state_set = pending.pop()
+            from_state = states[state_set]
+            if state_set & self.final_states:
+                deterministic_finite_state_machine.add_final_states({from_state})
+                if tags:
+                    deterministic_finite_state_machine.tags[from_state] = combine(
+                        tags.get(state, 0) for state in state_set & self.final_states
+                    )
+            for element_class, to_states in self.moves(state_set, alphabet, element_classes).items():
+                to_state_set = _closure(to_states)
+                if to_state_set not in states:
+                    states[to_state_set] = len(states)
+                    pending.append(to_state_set)
+                deterministic_finite_state_machine.add_transition(element_class, from_state, states[to_state_set])
+        return deterministic_finite_state_machine
+
+    def minimize(self) -> "DeterministicFiniteStateMachine":
+        """DeterministicFiniteStateMachine: Returns the minimal DFA equivalent to the FSM, with its states numbered
+            from 0 to n - 1."""
+        return self.determinize().minimize()
+
+    def tabulate(self) -> "SparseTransitionTable":
+        """SparseTransitionTable: Returns the array-backed (CSR) representation of the FSM, with its elements grouped
+            in equivalence classes and the EPSILON closures already applied."""
+        from RE.TransitionTable import SparseTransitionTable
+
+        state_list = sorted(self.state_set)
+        index = {state: i for i, state in enumerate(state_list)}
+        alphabet = self.partition()
+        element_classes: Dict[KeyType, FrozenSet[int]] = {}
+        offsets = array("i", [0])
+        targets = array("i")
+        for state in state_list:
+            moves = self.moves({state}, alphabet, element_classes)
+            for element_class in range(alphabet.class_count):
+                if element_class in moves:
+                    targets.extend(sorted(index[to_state] for to_state in self.closure(moves[element_class])))
+                offsets.append(len(targets))
+        return SparseTransitionTable(
+            alphabet,
+            offsets,
+            targets,
+            frozenset(index[state] for state in self.closure(set(self.initial_states))),
+            bytearray(state in self.final_states for state in state_list)
+        )
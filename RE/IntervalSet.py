@@ -0,0 +1,75 @@
+from bisect import bisect_right
+from typing import Iterable, Tuple
+
+__all__ = (
+    "IntervalSet",
+    "interval_set_of"
+)
+
+
+class IntervalSet:
+    """Set of elements defined by sorted, disjoint and non-adjacent intervals of code points.
+
+    An IntervalSet is used as a single transition element of the FSM, whatever the number of elements it contains:
+    checking if an element belongs to it is a bisect over the intervals.
+
+    Attributes:
+        intervals (tuple of tuple of int and int): The first and the last code point of every interval.
+
+    Examples:
+        >>> from RE.IntervalSet import IntervalSet
+        >>> digits = IntervalSet((ord("0"), ord("9")))
+        >>> print("5" in digits, "a" in digits, digits | IntervalSet((ord("a"), ord("f"))))
+    """
+
+    __slots__ = ("intervals", "_lows")
+
+    intervals: Tuple[Tuple[int, int], ...]
+
+    def __init__(self, *intervals: Tuple[int, int]):
+        merged = []
+        for low, high in sorted(intervals):
+            assert low <= high
+            if merged and low <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], high))
+            else:
+                merged.append((low, high))
+        self.intervals = tuple(merged)
+        self._lows = tuple(low for low, _ in merged)
+
+    def __contains__(self, element: str) -> bool:
+        if type(element) is not str or len(element) != 1:
+            return False
+        code_point = ord(element)
+        i = bisect_right(self._lows, code_point) - 1
+        return i >= 0 and code_point <= self.intervals[i][1]
+
+    def __or__(self, interval_set: "IntervalSet") -> "IntervalSet":
+        return self.union(interval_set)
+
+    def __len__(self) -> int:
+        return sum(high - low + 1 for low, high in self.intervals)
+
+    def __bool__(self) -> bool:
+        return bool(self.intervals)
+
+    def __eq__(self, interval_set: object) -> bool:
+        return isinstance(interval_set, IntervalSet) and self.intervals == interval_set.intervals
+
+    def __hash__(self) -> int:
+        return hash(self.intervals)
+
+    def __repr__(self) -> str:
+        return "[" + "".join(
+            repr(chr(low))[1:-1] if low == high else f"{repr(chr(low))[1:-1]}-{repr(chr(high))[1:-1]}"
+            for low, high in self.intervals
+        ) + "]"
+
+    def union(self, interval_set: "IntervalSet") -> "IntervalSet":
+        """IntervalSet: Returns the elements that are in this set (self) or in the other set (interval_set)."""
+        return IntervalSet(*self.intervals, *interval_set.intervals)
+
+
+def interval_set_of(elements: Iterable[str]) -> IntervalSet:
+    """IntervalSet: Returns the IntervalSet that contains exactly the elements."""
+    return IntervalSet(*((ord(element), ord(element)) for element in elements))
@@ -0,0 +1,221 @@
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+from RE.Alphabet import Alphabet
+from RE.FiniteStateMachine import FiniteStateMachine, KeyType, Symbol
+
+__all__ = (
+    "LazyState",
+    "LazyDeterministicFiniteStateMachine"
+)
+
+
+class LazyState:
+    """State of a LazyDeterministicFiniteStateMachine.
+
+    Attributes:
+        states (frozenset of int): The states of the NFA that this state represents.
+        final (bool): True if at least one of the states is a final state of the NFA.
+        transitions (dict of int and LazyState): The next states that have already been computed for each class, None
+            if the DFA gets stuck.
+    """
+
+    __slots__ = ("states", "final", "transitions")
+
+    states: FrozenSet[int]
+    final: bool
+    transitions: Dict[int, Optional["LazyState"]]
+
+    def __init__(self, states: FrozenSet[int], final: bool):
+        self.states = states
+        self.final = final
+        self.transitions = {}
+
+
+class LazyDeterministicFiniteStateMachine:
+    """Lazy Deterministic Finite State Machine implementation.
+
+    The states of the DFA are built from the NFA the first time they are visited and kept in a cache, so only the part
+    of the DFA that the input actually uses is ever built. The transitions are computed once per class of the
+    alphabet of the NFA (see FiniteStateMachine.partition) instead of once per element. When the cache holds
+    cache_size states it is flushed and rebuilt on demand.
+
+    Attributes:
+        finite_state_machine (FiniteStateMachine): The NFA that is determinized.
+        alphabet (Alphabet): The class of every element.
+        cache_size (int): The maximum number of states kept in the cache.
+        initial_state (LazyState): Initial state of the DFA.
+        hits (int): Number of transitions that were found in the cache.
+        misses (int): Number of transitions that had to be computed from the NFA.
+        flushes (int): Number of times the cache was flushed.
+
+    Examples:
+        >>> from RE.RegularExpression.Literal import Literal
+        >>> from RE.RegularExpression.Wildcard import Wildcard
+        >>> from RE.RegularExpression.Zero import Zero
+        >>> expression = Zero(Wildcard()) + Literal("a")
+        >>> expression.compile(mode="lazy")
+        >>> print(expression.match(input("> ")), expression.engine.hits, expression.engine.misses)
+    """
+
+    finite_state_machine: FiniteStateMachine
+    alphabet: Alphabet
+    cache_size: int
+    initial_state: LazyState
+    hits: int
+    misses: int
+    flushes: int
+
+    def __init__(
+            self,
+            finite_state_machine: FiniteStateMachine,
+            cache_size: int = 4096
+    ):
+        super().__init__()
+        assert cache_size > 0
+        self.finite_state_machine = finite_state_machine
+        self.alphabet = finite_state_machine.partition()
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self.flushes = 0
+        self._cache: Dict[FrozenSet[int], LazyState] = {}
+        self.initial_state = self._state(
+            frozenset(finite_state_machine.closure(set(finite_state_machine.initial_states)))
+        )
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def __call__(self, string: str) -> Iterator[Tuple[KeyType, Optional[LazyState]]]:
+        return self.run(string)
+
+    def _state(self, states: FrozenSet[int]) -> LazyState:
+        state = self._cache.get(states)
+        if state is None:
+            if len(self._cache) >= self.cache_size:
+                self.flush()
+            state = LazyState(states, not self.finite_state_machine.final_states.isdisjoint(states))
+            self._cache[states] = state
+        return state
+
+    def flush(self):
+        """Empties the cache: only the initial state is kept."""
+        for state in self._cache.values():
+            state.transitions.clear()
+        self._cache.clear()
+        self.flushes += 1
+        if hasattr(self, "initial_state"):
+            self._cache[self.initial_state.states] = self.initial_state
+
+    def step(
+            self,
+            state: LazyState,
+            element: str
+    ) -> Optional[LazyState]:
+        """LazyState: Returns the next state of the state for the element, None if there is none."""
+        return self._step(state, self.alphabet[element])
+
+    def _step(
+            self,
+            state: LazyState,
+            element_class: int
+    ) -> Optional[LazyState]:
+        transitions = state.transitions
+        if element_class in transitions:
+            self.hits += 1
+            return transitions[element_class]
+        self.misses += 1
+        to_states = self.finite_state_machine.step(set(state.states), self.alphabet.representatives[element_class])
+        to_state = self._state(frozenset(to_states)) if to_states else None
+        transitions[element_class] = to_state
+        return to_state
+
+    def run(
+            self,
+            string: str
+    ) -> Iterator[Tuple[KeyType, Optional[LazyState]]]:
+        """iter of tuple of str and LazyState: Iterates the str through the DFA."""
+        state = self.initial_state
+        for element in string:
+            state = self.step(state, element)
+            yield element, state
+            if state is None:
+                return
+        yield Symbol.EOF, state
+
+    def last(
+            self,
+            string: str
+    ) -> Optional[LazyState]:
+        """LazyState: Returns the last state of iterating the str through the DFA, None if the DFA got stuck."""
+        state = self.initial_state
+        for element in string:
+            state = self.step(state, element)
+            if state is None:
+                break
+        return state
+
+    def accepts(
+            self,
+            string: str
+    ) -> bool:
+        """bool: Returns True if the last state is a final state after iterating the str through the DFA."""
+        state = self.last(string)
+        return state is not None and state.final
+
+    def longest(
+            self,
+            string: str,
+            start: int = 0,
+            end: int = None
+    ) -> Optional[int]:
+        """int: Returns the end of the longest non-empty prefix of string[start:end] accepted by the DFA, None if there
+            is none. The str is iterated once and the iteration stops as soon as the DFA gets stuck."""
+        end = len(string) if end is None else end
+        step = self._step
+        alphabet = self.alphabet
+        state = self.initial_state
+        last_position = None
+        for position in range(start, end):
+            state = step(state, alphabet[string[position]])
+            if state is None:
+                break
+            if state.final:
+                last_position = position + 1
+        return last_position
+
+    def search(
+            self,
+            string: str,
+            start: int = 0,
+            end: int = None
+    ) -> Optional[Tuple[int, int]]:
+        """tuple of int and int: Returns the start and the end of the leftmost-longest non-empty substring of
+            string[start:end] accepted by the DFA, None if there is none (see DeterministicFiniteStateMachine.search).
+        """
+        end = len(string) if end is None else end
+        step = self._step
+        alphabet = self.alphabet
+        threads: List[Tuple[int, LazyState]] = []
+        match_start = match_end = None
+        for position in range(start, end):
+            if match_start is None and all(state is not self.initial_state for _, state in threads):
+                threads.append((position, self.initial_state))
+            element_class = alphabet[string[position]]
+            new_threads = []
+            seen_states = set()
+            for thread_start, state in threads:
+                if match_start is not None and thread_start > match_start:
+                    break
+                state = step(state, element_class)
+                if state is None or state.states in seen_states:
+                    continue
+                seen_states.add(state.states)
+                new_threads.append((thread_start, state))
+                if state.final and (match_start is None or thread_start <= match_start):
+                    match_start, match_end = thread_start, position + 1
+            threads = new_threads
+            if match_start is not None and not threads:
+                break
+        if match_start is not None:
+            return match_start, match_end
@@ -1,20 +1,131 @@
+from bisect import bisect_left
 from collections import namedtuple
-from typing import Dict, Iterator, Tuple, List
+from hashlib import sha256
+from typing import Dict, Iterable, Iterator, Optional, Set, Tuple, List, Union, TextIO
 
+from RE.FiniteStateMachine import FiniteStateMachine, Symbol
 from RE.RegularExpression.Expression import Expression
+from RE.TransitionTable import TransitionTable
 
 __all__ = (
-    "Lexer"
+    "Lexer",
+    "TokenBuffer"
 )
 
 Token = namedtuple("Token", ["name", "match"])
 
 
+class TokenBuffer:
+    """Tokens of a string (as yielded by Lexer.lex) stored in a gap buffer, for Lexer.relex.
+
+    The tokens before the gap are stored with their positions, the tokens after it are stored in reverse order with
+    their positions minus shift, so shifting all of them after an edit only changes shift. An edit moves the gap to
+    the edited tokens, so consecutive edits close to each other only touch the tokens between them.
+
+    Attributes:
+        shift (int): What to add to the stored positions of the tokens after the gap.
+
+    Structures:
+        before (list of tuple of int and Token): The tokens before the gap.
+        after (list of tuple of int and Token): The tokens after the gap, in reverse order.
+
+    Examples:
+        >>> from RE.Lexer import Lexer, TokenBuffer
+        >>> from RE.RegularExpression.Literal import Literal
+        >>> lexer = Lexer(a=Literal("a"), b=Literal("b"))
+        >>> tokens = TokenBuffer(lexer.lex("abab"))
+        >>> lexer.relex("abbab", tokens, 2, 0, "b")
+        >>> print(list(tokens))
+    """
+
+    __slots__ = ("before", "after", "shift")
+
+    before: List[Tuple[int, Token]]
+    after: List[Tuple[int, Token]]
+    shift: int
+
+    def __init__(self, tokens: Iterable[Tuple[int, Token]] = ()):
+        self.before = list(tokens)
+        self.after = []
+        self.shift = 0
+
+    def __len__(self) -> int:
+        return len(self.before) + len(self.after)
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[Tuple[int, Token], List[Tuple[int, Token]]]:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if 0 <= i < len(self.before):
+            return self.before[i]
+        j = len(self) - 1 - i
+        if not 0 <= j < len(self.after):
+            raise IndexError(i)
+        position, token = self.after[j]
+        return position + self.shift, token
+
+    def __iter__(self) -> Iterator[Tuple[int, Token]]:
+        yield from self.before
+        shift = self.shift
+        for position, token in reversed(self.after):
+            yield position + shift, token
+
+    def _move(self, i: int):
+        before = self.before
+        after = self.after
+        shift = self.shift
+        while len(before) > i:
+            position, token = before.pop()
+            after.append((position - shift, token))
+        while len(before) < i:
+            position, token = after.pop()
+            before.append((position + shift, token))
+
+    def replace(self, first: int, last: int, tokens: List[Tuple[int, Token]], shift: int):
+        """Replaces the tokens from first to last (excluded) by tokens, and shifts the positions of the tokens after
+            them by shift."""
+        self._move(last)
+        del self.before[first:]
+        self.before += tokens
+        self.shift += shift
+
+
 class Lexer:
+    """Lexer implementation.
+
+    The expressions are compiled into a single FSM whose final states are tagged with the index of their expression,
+    and then into a minimal DFA. The keywords of all the expressions that only match keywords (see
+    Expression.keywords) share a single trie. Every token is the longest non-empty match of the DFA from the current position
+    (ties are resolved in favour of the expression defined first), found with a single forward scan.
+
+    Attributes:
+        expressions (dict of str and Expression): The expressions of the tokens, by name.
+        names (list of str): The name of the expression of each tag.
+        finite_state_machine (FiniteStateMachine): The FSM of all the expressions.
+        engine (TransitionTable): The minimal DFA of the FSM, tagged with the expression of each final state.
+        lookahead (int): The maximum number of characters read past the end of a token, None if it is unbounded.
+
+    Examples:
+        >>> from RE.Lexer import Lexer
+        >>> from RE.RegularExpression.Literal import Literal
+        >>> from RE.RegularExpression.One import One
+        >>> lexer = Lexer(number=One(Literal("0") >> Literal("9")), plus=Literal("+"))
+        >>> print(list(lexer.lex(input("> "))))
+    """
+
     expressions: Dict[str, Expression]
+    names: List[str]
+    finite_state_machine: FiniteStateMachine
+    engine: TransitionTable
+    lookahead: Optional[int]
 
     def __init__(self, **expressions: Expression):
         self.expressions = {**expressions}
+        self.names = []
+        self.finite_state_machine = None
+        self.engine = None
+        self.lookahead = None
 
     def __contains__(self, name: str) -> bool:
         return self.has_expression(name)
@@ -36,6 +147,7 @@ class Lexer:
 
     def add_expression(self, name: str, expression: Expression):
         self.expressions[name] = expression
+        self.engine = None
 
     def get_expression(self, name: str) -> Expression:
         assert self.has_expression(name)
@@ -44,20 +156,278 @@ class Lexer:
     def remove_expression(self, name: str):
         assert self.has_expression(name)
         del self.expressions[name]
+        self.engine = None
+
+    def compile(self, recompile=False):
+        """Generates the tagged FSM of the expressions and its minimal DFA (or finds them in Expression.cache)."""
+        if self.engine is not None and not recompile:
+            return
+        self.names = list(self.expressions)
+        cache = Expression.cache
+        key = None
+        if cache is not None:
+            fingerprints = tuple(expression.fingerprint() for expression in self.expressions.values())
+            if None not in fingerprints:
+                key = sha256(repr(("Lexer", fingerprints)).encode()).hexdigest()
+                cached = cache.get(key)
+                if cached is not None:
+                    self.finite_state_machine, self.engine, self.lookahead = cached
+                    return
+        finite_state_machine = FiniteStateMachine(initial_states={0})
+        tags = {}
+        counter = 1
+        trie: Dict[Tuple[int, str], int] = {}
+        for tag, expression in enumerate(self.expressions.values()):
+            keywords = expression.keywords()
+            if keywords is not None:
+                for keyword in keywords:
+                    state = 0
+                    for element in keyword:
+                        if (state, element) not in trie:
+                            trie[state, element] = counter
+                            finite_state_machine.add_transition(element, state, {counter})
+                            counter += 1
+                        state = trie[state, element]
+                    if state:
+                        finite_state_machine.add_final_states({state})
+                        tags.setdefault(state, tag)
+                continue
+            expression.compile(recompile)
+            expression_finite_state_machine = expression.finite_state_machine
+            state_set = expression_finite_state_machine.state_set
+            offset = counter - min(state_set)
+            for element, transitions in expression_finite_state_machine.transitions.items():
+                for from_state, to_states in transitions.items():
+                    if to_states:
+                        finite_state_machine.add_transition(
+                            element,
+                            from_state + offset,
+                            {to_state + offset for to_state in to_states}
+                        )
+            finite_state_machine.add_transition(
+                Symbol.EPSILON,
+                0,
+                {initial_state + offset for initial_state in expression_finite_state_machine.initial_states}
+            )
+            for final_state in expression_finite_state_machine.final_states:
+                finite_state_machine.add_final_states({final_state + offset})
+                tags[final_state + offset] = tag
+            counter = max(state_set) + offset + 1
+        self.finite_state_machine = finite_state_machine
+        self.engine = finite_state_machine.determinize(tags).minimize().tabulate()
+        self.lookahead = self._lookahead()
+        if key is not None:
+            cache.put(key, (self.finite_state_machine, self.engine, self.lookahead))
+
+    def _lookahead(self) -> Optional[int]:
+        table = self.engine.table
+        class_count = self.engine.class_count
+        tags = self.engine.tags
+
+        def _next_states(state: int) -> Set[int]:
+            return {
+                to_state
+                for to_state in table[state * class_count:(state + 1) * class_count]
+                if to_state >= 0 and tags[to_state] < 0
+            }
+
+        starts = set()
+        for state in range(self.engine.state_count):
+            if tags[state] >= 0:
+                starts.update(_next_states(state))
+        next_states: Dict[int, Set[int]] = {}
+        pending = list(starts)
+        while pending:
+            state = pending.pop()
+            if state not in next_states:
+                next_states[state] = _next_states(state)
+                pending.extend(next_states[state])
+        previous_states: Dict[int, List[int]] = {state: [] for state in next_states}
+        for state, to_states in next_states.items():
+            for to_state in to_states:
+                previous_states[to_state].append(state)
+        degrees = {state: len(to_states) for state, to_states in next_states.items()}
+        lengths = {}
+        pending = [state for state, degree in degrees.items() if degree == 0]
+        while pending:
+            state = pending.pop()
+            lengths[state] = 1 + max((lengths[to_state] for to_state in next_states[state]), default=0)
+            for from_state in previous_states[state]:
+                degrees[from_state] -= 1
+                if degrees[from_state] == 0:
+                    pending.append(from_state)
+        if len(lengths) < len(next_states):
+            return None
+        return max((lengths[state] for state in starts), default=0)
+
+    def longest(self, string: str, start: int = 0, end: int = None) -> Tuple[int, int]:
+        """tuple of int and int: Returns the end of the longest non-empty prefix of string[start:end] matched by an
+            expression and the tag of the expression, None if there is none."""
+        self.compile()
+        end = len(string) if end is None else end
+        engine = self.engine
+        table = engine.table
+        alphabet = engine.alphabet
+        class_count = engine.class_count
+        tags = engine.tags
+        state = engine.initial_state
+        last = None
+        for position in range(start, end):
+            state = table[state * class_count + alphabet[string[position]]]
+            if state < 0:
+                break
+            if tags[state] >= 0:
+                last = position + 1, tags[state]
+        return last
 
     def lex(self, string: str) -> Iterator[Tuple[int, Token]]:
+        self.compile()
         position = 0
         while position < len(string):
-            tokens: List[Token] = []
-            for name, expression in self.expressions.items():
-                match = expression.match(string, position)
-                if match:
-                    tokens.append(Token(name, match))
-            if tokens:
-                token = max(tokens, key=lambda _: len(_.match))
-                yield position, token
-                position += len(token.match)
+            last = self.longest(string, position)
+            if last is not None:
+                end, tag = last
+                yield position, Token(self.names[tag], string[position:end])
+                position = end
             else:
                 raise Exception
                 # yield position, Token('UNDEFINED', string[position:])
                 # return
+
+    def lex_stream(
+            self,
+            stream: Union[TextIO, Iterable[str]],
+            chunk_size: int = 1 << 16
+    ) -> Iterator[Tuple[int, Token]]:
+        """iter of tuple of int and Token: Yields the tokens (and their absolute positions) of a text file object (read
+            chunk_size characters at a time) or of an iterable of str chunks.
+
+        The DFA is stepped through the chunks as they come, so tokens can cross chunk boundaries. Only the characters
+        of the current token (from its start to the scan position) are kept, so the memory used doesn't depend on the
+        size of the input but on the size of its longest token.
+        """
+        assert chunk_size > 0
+        self.compile()
+        engine = self.engine
+        table = engine.table
+        alphabet = engine.alphabet
+        class_count = engine.class_count
+        tags = engine.tags
+        names = self.names
+        chunks = _read(stream, chunk_size) if hasattr(stream, "read") else iter(stream)
+        buffer = ""
+        offset = 0
+        start = position = 0
+        state = engine.initial_state
+        last = None
+        exhausted = False
+        while True:
+            if position < len(buffer):
+                state = table[state * class_count + alphabet[buffer[position]]]
+                position += 1
+                if state >= 0 and tags[state] >= 0:
+                    last = position, tags[state]
+            elif not exhausted:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                elif not isinstance(chunk, str):
+                    raise TypeError(f"Expected str chunks (open the file in text mode), got {type(chunk).__name__}")
+                else:
+                    buffer = buffer[start:] + chunk
+                    offset += start
+                    position -= start
+                    if last is not None:
+                        last = last[0] - start, last[1]
+                    start = 0
+                continue
+            elif start < len(buffer):
+                state = -1
+            else:
+                return
+            if state < 0:
+                if last is None:
+                    raise Exception
+                end, tag = last
+                yield offset + start, Token(names[tag], buffer[start:end])
+                start = position = end
+                state = engine.initial_state
+                last = None
+
+    def relex(
+            self,
+            string: str,
+            tokens: Union[List[Tuple[int, Token]], TokenBuffer],
+            offset: int,
+            deleted: int,
+            inserted: str
+    ) -> Tuple[int, int]:
+        """tuple of int and int: Updates the tokens of a string (as yielded by Lexer.lex) after an edit that replaced
+            deleted characters at offset with inserted, string being the edited string. Returns the indices of the
+            first token and of the token after the last token that were re-lexed.
+
+        Only the tokens whose scan may have read the edited characters (see Lexer.lookahead) are re-lexed: when the
+        lookahead is unbounded, the tokens are walked back from the edit until the scan of one of them stops before it.
+        The tokens are re-lexed until a token starts after the edit where a token of the previous string started: from
+        there the tokens are the same, their positions are shifted. The tokens after the edit are rebuilt to shift a list, not a TokenBuffer, so only
+        a TokenBuffer makes the cost of an edit independent of the size of the string.
+        """
+        self.compile()
+        shift = len(inserted) - deleted
+        first = bisect_left(tokens, (offset,))
+        if self.lookahead is None:
+            while first > 0 and self._reaches(string, tokens[first - 1][0], offset):
+                first -= 1
+        else:
+            while first > 0 and tokens[first - 1][0] + len(tokens[first - 1][1].match) + self.lookahead >= offset:
+                first -= 1
+        position = tokens[first][0] if first < len(tokens) else (
+            tokens[-1][0] + len(tokens[-1][1].match) if tokens else 0
+        )
+        last = first
+        new_tokens = []
+        while position < len(string):
+            while last < len(tokens) and tokens[last][0] + shift < position:
+                last += 1
+            if (
+                    position >= offset + len(inserted)
+                    and last < len(tokens)
+                    and tokens[last][0] + shift == position
+            ):
+                break
+            match = self.longest(string, position)
+            if match is None:
+                raise Exception
+            end, tag = match
+            new_tokens.append((position, Token(self.names[tag], string[position:end])))
+            position = end
+        else:
+            last = len(tokens)
+        if isinstance(tokens, TokenBuffer):
+            tokens.replace(first, last, new_tokens, shift)
+            return first, first + len(new_tokens)
+        if shift:
+            tokens[last:] = [(position + shift, token) for position, token in tokens[last:]]
+        tokens[first:last] = new_tokens
+        return first, first + len(new_tokens)
+
+    def _reaches(self, string: str, start: int, offset: int) -> bool:
+        engine = self.engine
+        table = engine.table
+        alphabet = engine.alphabet
+        class_count = engine.class_count
+        state = engine.initial_state
+        for position in range(start, min(offset, len(string))):
+            state = table[state * class_count + alphabet[string[position]]]
+            if state < 0:
+                return False
+        return True
+
+
+def _read(stream: TextIO, chunk_size: int) -> Iterator[str]:
+    """iter of str: Yields the chunks read from a file object until it reads an empty one."""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
@@ -1,20 +1,82 @@
 from collections import namedtuple
-from typing import Dict, List
+from itertools import chain
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple, Union
 
+from RE.FiniteStateMachine import Symbol
 from RE.Lexer import Token
 
 __all__ = (
     "Parser"
 )
 
-Branch = namedtuple("Branch", ["name", "children"])
+
+class Branch(namedtuple("Branch", ["name", "children", "state", "size"], defaults=(None, None))):
+    """Node of a parse tree.
+
+    Attributes:
+        name (str): The name of the sentence reduced.
+        children (list of Branch and Token): The Branch and Token reduced.
+        state (int): The state of the Parser before the first token of the branch was shifted, None if the branch
+            wasn't built by a Parser.
+        size (int): The number of tokens of the branch, None if the branch wasn't built by a Parser.
+    """
+
+    __slots__ = ()
+
+
+NameType = Union[str, Symbol]
+ItemType = Tuple[int, int]
 
 
 class Parser:
+    """LALR(1) Parser implementation.
+
+    The sentences define a context-free grammar: every name is a nonterminal and every name used in a sentence that
+    isn't defined is a terminal (the name of a Token). The first name defined is the start of the grammar. The
+    shift/reduce tables are generated once (LR(1) items whose states with the same core are merged on the fly) and
+    then every Token is parsed in constant time with an explicit stack.
+
+    Conflicts are resolved like yacc does: with the precedence and associativity of the terminals (see
+    Parser.add_precedence) when both the terminal and the sentence (its last terminal) have one, by shifting for the
+    rest of the shift/reduce conflicts and by reducing the sentence defined first for reduce/reduce conflicts. The
+    conflicts that aren't resolved by precedence are kept in Parser.conflicts.
+
+    Attributes:
+        sentences (dict of str and list of list of str): The sentences (right-hand sides) of each name.
+        precedence (dict of str and tuple of int and str): The precedence level and the associativity ("left",
+            "right" or "nonassoc") of the terminals.
+        conflicts (list of tuple of int and NameType): The state and the terminal of every conflict resolved by
+            default.
+
+    Structures:
+        productions (list of tuple of NameType and tuple of str): The sentences, numbered; production 0 is
+            Symbol.EOF -> start.
+        actions (list of dict of NameType and int): The action of each state for each terminal: shift to state i (i),
+            reduce production p (-p - 1) or accept (-1, reduce production 0).
+        gotos (list of dict of str and int): The next state of each state after a reduction to each name.
+
+    Examples:
+        >>> from RE.Lexer import Token
+        >>> from RE.Parser import Parser
+        >>> parser = Parser(expression=[["number"], ["expression", "plus", "expression"]])
+        >>> parser.add_precedence("left", "plus")
+        >>> print(parser.parse([Token("number", "1"), Token("plus", "+"), Token("number", "2")]))
+    """
+
     sentences: Dict[str, List[List[str]]]
+    precedence: Dict[str, Tuple[int, str]]
+    conflicts: List[Tuple[int, NameType]]
+    productions: List[Tuple[NameType, Tuple[str, ...]]]
+    actions: List[Dict[NameType, int]]
+    gotos: List[Dict[str, int]]
 
     def __init__(self, **sentences):
         self.sentences = {**sentences}
+        self.precedence = {}
+        self.conflicts = []
+        self.productions = []
+        self.actions = None
+        self.gotos = None
 
     def __contains__(self, name: str) -> bool:
         return self.has_sentence(name)
@@ -28,7 +90,7 @@ class Parser:
     def __delitem__(self, name: str):
         self.remove_sentence(name)
 
-    def __call__(self, tokens: List[Token]) -> List[Branch]:
+    def __call__(self, tokens: Iterable[Token]) -> Branch:
         return self.parse(tokens)
 
     def has_sentence(self, name: str) -> bool:
@@ -36,30 +98,265 @@ class Parser:
 
     def add_sentence(self, name: str, sentences: List[List[Token]]):
         self.sentences[name] = sentences
+        self.actions = None
 
     def get_sentence(self, name: str) -> List[List[Token]]:
         return self.sentences[name]
 
     def remove_sentence(self, name: str):
         del self.sentences[name]
+        self.actions = None
+
+    def add_precedence(self, associativity: str, *names: str):
+        """Declares terminals with the same associativity and a precedence higher than the ones declared before."""
+        assert associativity in ("left", "right", "nonassoc")
+        level = len({level for level, _ in self.precedence.values()}) + 1
+        for name in names:
+            self.precedence[name] = level, associativity
+        self.actions = None
+
+    def _first(self) -> Tuple[Dict[str, Set[NameType]], Set[str]]:
+        first: Dict[str, Set[NameType]] = {name: set() for name in self.sentences}
+        nullable: Set[str] = set()
+        changed = True
+        while changed:
+            changed = False
+            for name, sentence in self.productions[1:]:
+                size = len(first[name])
+                for symbol in sentence:
+                    if symbol in self.sentences:
+                        first[name].update(first[symbol])
+                        if symbol in nullable:
+                            continue
+                    else:
+                        first[name].add(symbol)
+                    break
+                else:
+                    if name not in nullable:
+                        nullable.add(name)
+                        changed = True
+                changed = changed or len(first[name]) != size
+        return first, nullable
+
+    def compile(self, recompile=False):
+        """Generates the LALR(1) tables of the grammar."""
+        if self.actions is not None and not recompile:
+            return
+        assert self.sentences
+        start = next(iter(self.sentences))
+        self.productions = [(Symbol.EOF, (start,))]
+        productions_of: Dict[str, List[int]] = {}
+        for name, sentences in self.sentences.items():
+            for sentence in sentences:
+                productions_of.setdefault(name, []).append(len(self.productions))
+                self.productions.append((name, tuple(sentence)))
+        productions = self.productions
+        first, nullable = self._first()
+
+        def _closure(kernel: Dict[ItemType, Set[NameType]]) -> Dict[ItemType, Set[NameType]]:
+            items = {item: set(lookaheads) for item, lookaheads in kernel.items()}
+            pending = list(items)
+            while pending:
+                production, dot = pending.pop()
+                sentence = productions[production][1]
+                if dot == len(sentence) or sentence[dot] not in self.sentences:
+                    continue
+                lookaheads = set()
+                for symbol in sentence[dot + 1:]:
+                    if symbol in self.sentences:
+                        lookaheads.update(first[symbol])
+                        if symbol in nullable:
+                            continue
+                    else:
+                        lookaheads.add(symbol)
+                    break
+                else:
+                    lookaheads.update(items[production, dot])
+                for _production in productions_of.get(sentence[dot], ()):
+                    item = _production, 0
+                    if item not in items:
+                        items[item] = set(lookaheads)
+                        pending.append(item)
+                    elif not lookaheads <= items[item]:
+                        items[item].update(lookaheads)
+                        pending.append(item)
+            return items
+
+        kernels: List[Dict[ItemType, Set[NameType]]] = [{(0, 0): {Symbol.EOF}}]
+        cores: Dict[FrozenSet[ItemType], int] = {frozenset(kernels[0]): 0}
+        transitions: List[Dict[str, int]] = [{}]
+        pending_states = [0]
+        while pending_states:
+            state = pending_states.pop()
+            gotos: Dict[str, Dict[ItemType, Set[NameType]]] = {}
+            for (production, dot), lookaheads in _closure(kernels[state]).items():
+                sentence = productions[production][1]
+                if dot < len(sentence):
+                    gotos.setdefault(sentence[dot], {})[production, dot + 1] = lookaheads
+            for symbol, kernel in gotos.items():
+                core = frozenset(kernel)
+                if core not in cores:
+                    cores[core] = len(kernels)
+                    kernels.append(kernel)
+                    transitions.append({})
+                    pending_states.append(cores[core])
+                else:
+                    to_kernel = kernels[cores[core]]
+                    if any(not lookaheads <= to_kernel[item] for item, lookaheads in kernel.items()):
+                        for item, lookaheads in kernel.items():
+                            to_kernel[item].update(lookaheads)
+                        pending_states.append(cores[core])
+                transitions[state][symbol] = cores[core]
+
+        self.conflicts = []
+        self.actions = []
+        self.gotos = []
+        for state, kernel in enumerate(kernels):
+            actions: Dict[NameType, int] = {}
+            for symbol, to_state in transitions[state].items():
+                if symbol not in self.sentences:
+                    actions[symbol] = to_state
+            for (production, dot), lookaheads in sorted(_closure(kernel).items()):
+                if dot < len(productions[production][1]):
+                    continue
+                for lookahead in lookaheads:
+                    action = actions.get(lookahead)
+                    if action is None:
+                        actions[lookahead] = -production - 1
+                    elif action >= 0:
+                        resolution = self._resolve(production, lookahead)
+                        if resolution is None:
+                            self.conflicts.append((state, lookahead))
+                        elif resolution == "reduce":
+                            actions[lookahead] = -production - 1
+                        elif resolution == "error":
+                            del actions[lookahead]
+                    else:
+                        self.conflicts.append((state, lookahead))
+            self.actions.append(actions)
+            self.gotos.append({
+                symbol: to_state
+                for symbol, to_state in transitions[state].items()
+                if symbol in self.sentences
+            })
+
+    def _resolve(self, production: int, terminal: NameType) -> str:
+        terminal_precedence = self.precedence.get(terminal)
+        production_precedence = None
+        for symbol in reversed(self.productions[production][1]):
+            if symbol not in self.sentences:
+                production_precedence = self.precedence.get(symbol)
+                break
+        if terminal_precedence is None or production_precedence is None:
+            return None
+        if terminal_precedence[0] > production_precedence[0]:
+            return "shift"
+        if terminal_precedence[0] < production_precedence[0]:
+            return "reduce"
+        return {"left": "reduce", "right": "shift", "nonassoc": "error"}[terminal_precedence[1]]
+
+    def _reduce(self, states: List[int], values: List[Union[Branch, Token]], production: int):
+        name, sentence = self.productions[production]
+        if sentence:
+            children = values[-len(sentence):]
+            del values[-len(sentence):]
+            del states[-len(sentence):]
+        else:
+            children = []
+        values.append(Branch(
+            name,
+            children,
+            states[-1],
+            sum(1 if isinstance(child, Token) else child.size for child in children)
+        ))
+        states.append(self.gotos[states[-1]][name])
+
+    def parse(self, tokens: Iterable[Token]) -> Branch:
+        """Branch: Returns the tree of the tokens: a Branch for every sentence reduced, with the Branch and Token it
+            reduced as children."""
+        self.compile()
+        actions = self.actions
+        states = [0]
+        values: List[Union[Branch, Token]] = []
+        for token in chain(tokens, (Token(Symbol.EOF, ""),)):
+            while True:
+                action = actions[states[-1]].get(token.name)
+                if action is None:
+                    raise Exception(f"Unexpected token: {token}")
+                if action >= 0:
+                    states.append(action)
+                    values.append(token)
+                    break
+                if action == -1:
+                    return values[0]
+                self._reduce(states, values, -action - 1)
+
+    def reparse(self, tree: Branch, first: int, deleted: int, inserted: List[Token]) -> Branch:
+        """Branch: Returns the tree of the tokens of a tree (built by Parser.parse or Parser.reparse) after an edit that
+            replaced deleted tokens at index first with inserted.
+
+        The tree is split along the edit into the largest subtrees before and after it, which are shifted as a whole
+        when the parser reaches them in the state they were built in (and, for the subtrees before the edit, when the
+        token that follows them is unchanged); otherwise they are broken down into their children. Only the edited
+        tokens and the branches that contain them are parsed again.
+        """
+        assert tree.size is not None and first + deleted <= tree.size
+        self.compile()
+        actions = self.actions
+        last = first + deleted
+        prefix: List[Tuple[Union[Branch, Token], int]] = []
+        suffix: List[Tuple[Union[Branch, Token], int]] = []
+        pending: List[Tuple[Branch, int]] = [(tree, 0)]
+        while pending:
+            branch, start = pending.pop()
+            for child in branch.children:
+                size = 1 if isinstance(child, Token) else child.size
+                if start + size <= first:
+                    prefix.append((child, start))
+                elif start >= last:
+                    suffix.append((child, start))
+                elif isinstance(child, Branch):
+                    pending.append((child, start))
+                start += size
+        prefix.sort(key=lambda _: _[1])
+        suffix.sort(key=lambda _: _[1])
+        stream = [*prefix, *((token, None) for token in inserted), *suffix]
+        stream.reverse()
 
-    def parse(self, tokens: List[Token]) -> List[Branch]:
-        tree = tokens.copy()
-        while len(tree) > 1:
-            for name, sentences in self.sentences.items():
-                for sentence in sentences:
-                    if len(sentence) > len(tree):
-                        continue
-                    for offset in range(len(tree) - len(sentence) + 1):
-                        if all(
-                                sentence[i] == tree[j]
-                                for i, j in enumerate(range(offset, offset + len(sentence)))
-                        ):
-                            # reduce
-                            tree = [
-                                *tree[:offset],
-                                Branch(name, tree[offset:offset + len(sentence)]),
-                                *tree[offset + len(sentence):]
-                            ]
-                            print(tree)
-        return tree
+        states = [0]
+        values: List[Union[Branch, Token]] = []
+        end = Token(Symbol.EOF, "")
+        while True:
+            element, start = stream[-1] if stream else (end, None)
+            if isinstance(element, Branch) and not element.size:
+                stream.pop()
+                continue
+            token = element
+            while isinstance(token, Branch):
+                token = next(child for child in token.children if isinstance(child, Token) or child.size)
+            action = actions[states[-1]].get(token.name)
+            while action is not None and action < -1:
+                self._reduce(states, values, -action - 1)
+                action = actions[states[-1]].get(token.name)
+            if action is None:
+                raise Exception(f"Unexpected token: {token}")
+            if action == -1:
+                return values[0]
+            stream.pop()
+            if isinstance(element, Token):
+                states.append(action)
+                values.append(element)
+            elif (
+                    start is not None
+                    and (start + element.size < first or start >= last)
+                    and element.state == states[-1]
+            ):
+                states.append(self.gotos[states[-1]][element.name])
+                values.append(element)
+            else:
+                children = []
+                for child in element.children:
+                    children.append((child, start))
+                    if start is not None:
+                        start += 1 if isinstance(child, Token) else child.size
+                stream.extend(reversed(children))
@@ -0,0 +1,176 @@
+from hashlib import sha256
+from typing import Dict, Iterable, List, Tuple
+
+from RE.FiniteStateMachine import FiniteStateMachine, Symbol
+from RE.RegularExpression.Expression import Expression
+from RE.TransitionTable import TransitionTable
+
+__all__ = (
+    "PatternSet"
+)
+
+
+class PatternSet:
+    """Set of expressions matched together.
+
+    The expressions are compiled into a single FSM whose final states are tagged with the index of their expression,
+    and then into a minimal DFA where every final state is tagged with the set of expressions it accepts (stored as a
+    bitmap, bit i being the i-th expression). A str is iterated once through the DFA, whatever the number of
+    expressions, to find every expression that matches it.
+
+    Attributes:
+        expressions (dict of str and Expression): The expressions, by name.
+        names (list of str): The name of the expression of each bit.
+        finite_state_machine (FiniteStateMachine): The FSM of all the expressions.
+        engine (TransitionTable): The minimal DFA of the FSM, tagged with the index of a bitmap of masks.
+
+    Structures:
+        masks (list of int): The bitmap of the expressions accepted by the final states with each tag.
+
+    Examples:
+        >>> from RE.PatternSet import PatternSet
+        >>> from RE.RegularExpression.Literal import Literal
+        >>> from RE.RegularExpression.One import One
+        >>> pattern_set = PatternSet(number=One(Literal("0") >> Literal("9")), zero=Literal("0"))
+        >>> print(pattern_set.match(input("> ")))
+    """
+
+    expressions: Dict[str, Expression]
+    names: List[str]
+    finite_state_machine: FiniteStateMachine
+    engine: TransitionTable
+    masks: List[int]
+
+    def __init__(self, **expressions: Expression):
+        self.expressions = {**expressions}
+        self.names = []
+        self.finite_state_machine = None
+        self.engine = None
+        self.masks = []
+
+    def __contains__(self, name: str) -> bool:
+        return self.has_expression(name)
+
+    def __setitem__(self, name: str, expression: Expression):
+        self.add_expression(name, expression)
+
+    def __getitem__(self, name: str) -> Expression:
+        return self.get_expression(name)
+
+    def __delitem__(self, name: str):
+        self.remove_expression(name)
+
+    def __call__(self, string: str) -> Tuple[str, ...]:
+        return self.match(string)
+
+    def has_expression(self, name: str) -> bool:
+        return name in self.expressions
+
+    def add_expression(self, name: str, expression: Expression):
+        self.expressions[name] = expression
+        self.engine = None
+
+    def get_expression(self, name: str) -> Expression:
+        assert self.has_expression(name)
+        return self.expressions[name]
+
+    def remove_expression(self, name: str):
+        assert self.has_expression(name)
+        del self.expressions[name]
+        self.engine = None
+
+    def compile(self, recompile=False):
+        """Generates the tagged FSM of the expressions and its minimal DFA (or finds them in Expression.cache)."""
+        if self.engine is not None and not recompile:
+            return
+        self.names = list(self.expressions)
+        cache = Expression.cache
+        key = None
+        if cache is not None:
+            fingerprints = tuple(expression.fingerprint() for expression in self.expressions.values())
+            if None not in fingerprints:
+                key = sha256(repr(("PatternSet", fingerprints)).encode()).hexdigest()
+                cached = cache.get(key)
+                if cached is not None:
+                    self.finite_state_machine, self.engine, self.masks = cached
+                    return
+        finite_state_machine = FiniteStateMachine(initial_states={0})
+        tags = {}
+        counter = 1
+        for tag, expression in enumerate(self.expressions.values()):
+            expression.compile(recompile)
+            expression_finite_state_machine = expression.finite_state_machine
+            state_set = expression_finite_state_machine.state_set
+            offset = counter - min(state_set)
+            for element, transitions in expression_finite_state_machine.transitions.items():
+                for from_state, to_states in transitions.items():
+                    if to_states:
+                        finite_state_machine.add_transition(
+                            element,
+                            from_state + offset,
+                            {to_state + offset for to_state in to_states}
+                        )
+            finite_state_machine.add_transition(
+                Symbol.EPSILON,
+                0,
+                {initial_state + offset for initial_state in expression_finite_state_machine.initial_states}
+            )
+            for final_state in expression_finite_state_machine.final_states:
+                finite_state_machine.add_final_states({final_state + offset})
+                tags[final_state + offset] = tag
+            counter = max(state_set) + offset + 1
+        mask_tags: Dict[int, int] = {}
+
+        def _combine(final_tags: Iterable[int]) -> int:
+            mask = 0
+            for final_tag in final_tags:
+                mask |= 1 << final_tag
+            return mask_tags.setdefault(mask, len(mask_tags))
+
+        self.finite_state_machine = finite_state_machine
+        self.engine = finite_state_machine.determinize(tags, _combine).minimize().tabulate()
+        self.masks = list(mask_tags)
+        if key is not None:
+            cache.put(key, (self.finite_state_machine, self.engine, self.masks))
+
+    def mask(self, string: str, start: int = 0, end: int = None) -> int:
+        """int: Returns the bitmap of the expressions that match a non-empty prefix of string[start:end]."""
+        self.compile()
+        end = len(string) if end is None else end
+        engine = self.engine
+        table = engine.table
+        alphabet = engine.alphabet
+        class_count = engine.class_count
+        tags = engine.tags
+        masks = self.masks
+        state = engine.initial_state
+        mask = 0
+        for position in range(start, end):
+            state = table[state * class_count + alphabet[string[position]]]
+            if state < 0:
+                break
+            if tags[state] >= 0:
+                mask |= masks[tags[state]]
+        return mask
+
+    def full_mask(self, string: str) -> int:
+        """int: Returns the bitmap of the expressions that match the whole str."""
+        self.compile()
+        state = self.engine.last(string)
+        if state < 0 or self.engine.tags[state] < 0:
+            return 0
+        return self.masks[self.engine.tags[state]]
+
+    def match(self, string: str, start: int = 0, end: int = None) -> Tuple[str, ...]:
+        """tuple of str: Returns the names of the expressions that match the string (see Expression.match), in the
+            order they were defined."""
+        assert string
+        return self._names(self.mask(string, start, end))
+
+    def fullmatch(self, string: str) -> Tuple[str, ...]:
+        """tuple of str: Returns the names of the expressions that match the whole str, in the order they were
+            defined."""
+        return self._names(self.full_mask(string))
+
+    def _names(self, mask: int) -> Tuple[str, ...]:
+        return tuple(name for i, name in enumerate(self.names) if mask >> i & 1)
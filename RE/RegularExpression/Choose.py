@@ -1,6 +1,6 @@
-from typing import Tuple
+from typing import List, Optional, Tuple
 
-from RE.FiniteStateMachine import FiniteStateMachine
+from RE.FiniteStateMachine import FiniteStateMachine, Symbol
 from RE.RegularExpression.Expression import Expression
 
 __all__ = (
@@ -13,7 +13,9 @@ class Choose(Expression):
 
     Attributes:
         inner_blocks (list of Expression): The options to choose: at a given point, there will be multiple paths in the
-            FSM, and those paths are defined by these blocks.
+            FSM, and those paths are defined by these blocks. Options with the same structure (see
+            Expression.structure) are built once. If every option is a keyword (see Expression.keywords), the options
+            are built as a trie, sharing their prefixes.
 
     Examples:
         >>> from RE.RegularExpression.Literal import Literal
@@ -30,8 +32,18 @@ class Choose(Expression):
     def alternate(self, expression: "Expression") -> "Expression":
         if isinstance(expression, Choose):
             self.inner_blocks += expression.inner_blocks
-            return self
-        return super().concatenate(expression)
+        else:
+            self.inner_blocks.append(expression)
+        return self
+
+    def keywords(self) -> Optional[List[str]]:
+        keywords = []
+        for inner_block in self.inner_blocks:
+            inner_keywords = inner_block.keywords()
+            if inner_keywords is None:
+                return None
+            keywords += inner_keywords
+        return keywords
 
     def build(
             self,
@@ -40,7 +52,16 @@ class Choose(Expression):
             counter: int,
             end_state: int = None
     ) -> Tuple[int, int]:
+        keywords = self.keywords()
+        if keywords is not None:
+            return self._build_trie(finite_state_machine, base_state, counter, end_state, keywords)
+        structures = set()
         for inner_block in self.inner_blocks:
+            structure = inner_block.structure()
+            if structure is not None:
+                if structure in structures:
+                    continue
+                structures.add(structure)
             end_state, counter = inner_block.build(
                 finite_state_machine,
                 base_state,
@@ -48,3 +69,34 @@ class Choose(Expression):
                 end_state
             )
         return end_state, counter
+
+    @staticmethod
+    def _build_trie(
+            finite_state_machine: FiniteStateMachine,
+            base_state: int,
+            counter: int,
+            end_state: Optional[int],
+            keywords: List[str]
+    ) -> Tuple[int, int]:
+        if end_state is None:
+            end_state = counter
+            counter += 1
+        prefixes = {prefix for keyword in keywords for prefix in (keyword[:i] for i in range(1, len(keyword)))}
+        states = {"": base_state}
+        for keyword in sorted(set(keywords)):
+            if not keyword:
+                finite_state_machine.add_transition(Symbol.EPSILON, base_state, {end_state})
+                continue
+            for i in range(1, len(keyword) + 1):
+                prefix = keyword[:i]
+                if prefix in states:
+                    continue
+                to_states = set()
+                if prefix in prefixes:
+                    states[prefix] = counter
+                    to_states.add(counter)
+                    counter += 1
+                if i == len(keyword):
+                    to_states.add(end_state)
+                finite_state_machine.add_transition(keyword[i - 1], states[keyword[:i - 1]], to_states)
+        return end_state, counter
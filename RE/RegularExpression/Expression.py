@@ -1,16 +1,85 @@
-from typing import List, Tuple, Iterator
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import sha256
+from os import cpu_count
+from typing import Iterable, List, Optional, Tuple, Iterator, Union
 
+from RE.AhoCorasickAutomaton import AhoCorasickAutomaton
+from RE.BitParallelFiniteStateMachine import BitParallelFiniteStateMachine
+from RE.CompileCache import CompileCache
+from RE.DeterministicFiniteStateMachine import DeterministicFiniteStateMachine
 from RE.FiniteStateMachine import FiniteStateMachine
+from RE.LazyDeterministicFiniteStateMachine import LazyDeterministicFiniteStateMachine
+from RE.ShiftAndFiniteStateMachine import MAXIMUM_POSITIONS, positions, ShiftAndFiniteStateMachine
+from RE.TransitionTable import TransitionTable, SparseTransitionTable
 
 __all__ = (
     "Expression"
 )
 
+# The version of the FSMs built from a structure: bumped whenever the FSM an expression builds changes, so that the
+# automata cached on disk by a previous version are not used.
+FINGERPRINT_VERSION = 4
+
+# The prefilter (see Expression._search) is not used for literals shorter than MINIMUM_LITERAL_LENGTH, and is given
+# up for the engine once it tried more than PREFILTER_STARTS starts, one every less than PREFILTER_SPACING elements.
+MINIMUM_LITERAL_LENGTH = 2
+PREFILTER_STARTS = 16
+PREFILTER_SPACING = 16
+
+DataType = Union[str, bytes, bytearray, memoryview]
+
+# The attributes of every Expression, which are not parameters.
+EXPRESSION_ATTRIBUTES = frozenset((
+    "finite_state_machine",
+    "engine",
+    "mode",
+    "prefilter",
+    "table",
+    "blocks",
+    "inner_blocks"
+))
+
+_expression: Optional["Expression"] = None
+
+
+def _plain(value: object) -> bool:
+    if value is None or type(value) in (str, int, float, bool):
+        return True
+    return type(value) is tuple and all(_plain(element) for element in value)
+
+
+def _text(data: DataType, start: int, end: int) -> str:
+    """str: Returns data[start:end] as a str, bytes being decoded as latin-1 (one element per byte)."""
+    return data[start:end] if isinstance(data, str) else bytes(data[start:end]).decode("latin-1")
+
+
+def _initialize(expression: "Expression"):
+    global _expression
+    _expression = expression
+
+
+def _search_chunk(data: DataType, offset: int, chunk_end: int) -> List[Tuple[int, Optional[int], Optional[int]]]:
+    string = _text(data, 0, len(data))
+    records = []
+    start = 0
+    while start < chunk_end:
+        match = _expression._search(string, start, len(string))
+        if match is None or match[0] >= chunk_end:
+            records.append((start + offset, None, None))
+            break
+        records.append((start + offset, match[0] + offset, match[1] + offset))
+        start = match[1] + 1
+    return records
+
 
 # TODO: Use abc.ABCMeta and @abstractmethod
 class Expression:
     """Baseclass for Regular Expressions.
 
+    The compiled automata are shared through Expression.cache (by default, in memory only): expressions with the same
+    structure (see Expression.fingerprint) are built and compiled once.
+
     Examples:
         >>> from RE.RegularExpression.Expression import Expression
         >>> from RE.Utility import import_finite_state_machine
@@ -20,14 +89,33 @@ class Expression:
     """
 
     finite_state_machine: FiniteStateMachine
+    engine: Union[
+        FiniteStateMachine,
+        DeterministicFiniteStateMachine,
+        LazyDeterministicFiniteStateMachine,
+        TransitionTable,
+        SparseTransitionTable,
+        BitParallelFiniteStateMachine,
+        ShiftAndFiniteStateMachine,
+        AhoCorasickAutomaton
+    ]
+    mode: str
+    prefilter: Optional[Tuple[str, Optional[int]]]
+    table: Optional[TransitionTable]
     blocks: List["Expression"]
     inner_blocks: List["Expression"]
 
+    cache: Optional[CompileCache] = CompileCache()
+
     def __init__(
             self,
             finite_state_machine: FiniteStateMachine = None
     ):
         self.finite_state_machine = finite_state_machine
+        self.engine = None
+        self.mode = "auto"
+        self.prefilter = None if finite_state_machine is None else _prefilter(finite_state_machine)
+        self.table = None
         self.blocks = []
         self.inner_blocks = []
 
@@ -58,26 +146,124 @@ class Expression:
         from RE.RegularExpression.Choose import Choose
         return Choose(self, expression)
 
-    def compile(self, recompile=False):
-        """Generates the FSM."""
+    def structure(self) -> Optional[tuple]:
+        """tuple: Returns the structure of this RE (self): its type, its parameters and the structure of its blocks,
+            None if the parameters of this RE (self) or of one of its blocks are unknown."""
+        parameters = self.parameters()
+        blocks = tuple(block.structure() for block in self.blocks)
+        inner_blocks = tuple(inner_block.structure() for inner_block in self.inner_blocks)
+        if parameters is None or None in blocks or None in inner_blocks:
+            return None
+        return f"{type(self).__module__}.{type(self).__qualname__}", parameters, blocks, inner_blocks
+
+    def parameters(self) -> Optional[tuple]:
+        """tuple: Returns the parameters of this RE (self) that change the FSM it builds, None if they are unknown. By
+            default, the attributes that Expression doesn't define, None if one of them isn't a plain value (a str, an
+            int, a float, a bool, None or a tuple of them)."""
+        parameters = []
+        for name, value in sorted(vars(self).items()):
+            if name in EXPRESSION_ATTRIBUTES:
+                continue
+            if not _plain(value):
+                return None
+            parameters.append((name, value))
+        return tuple(parameters)
+
+    def keywords(self) -> Optional[List[str]]:
+        """list of str: Returns the keywords matched by this RE (self) if it is a Literal or a Choose of keywords, None
+            otherwise."""
+        return None
+
+    def fingerprint(self) -> Optional[str]:
+        """str: Returns a hash of the structure of this RE (self), stable across processes, None if this RE (self)
+            doesn't build its FSM or if its structure is unknown."""
+        if type(self).build is Expression.build:
+            return None
+        structure = self.structure()
+        if structure is None:
+            return None
+        return sha256(repr((FINGERPRINT_VERSION, structure)).encode()).hexdigest()
+
+    def compile(self, recompile=False, mode: str = None, cache_size: int = 4096):
+        """Generates the FSM and the engine used to match it.
+
+        Modes:
+            auto: shift if the FSM has at most MAXIMUM_POSITIONS Glushkov positions, keywords if this RE (self) only
+                matches keywords, nfa otherwise.
+            nfa: The FSM is used as is.
+            dfa: The FSM is determinized and minimized, every character costs a single lookup.
+            lazy: The FSM is determinized on demand, keeping at most cache_size states.
+            table: The minimal DFA is stored in a flat array indexed by state and equivalence class.
+            sparse: The FSM is stored in flat arrays (CSR layout) indexed by state and equivalence class.
+            bitset: The FSM is simulated with its sets of states stored as int bitmasks, stepped 8 states at a time.
+            shift: The Glushkov automaton of the FSM is simulated with Shift-And, its positions stored in a single int.
+            keywords: The keywords of this RE (self) are matched with an Aho-Corasick automaton.
+        """
+        cache = Expression.cache
+        fingerprint = None
         if self.finite_state_machine is None or recompile:
-            self.finite_state_machine = FiniteStateMachine(
-                initial_states={0}
-            )
-            base_state, counter = self.build(self.finite_state_machine, 0, 1)
-            self.finite_state_machine.add_final_states({base_state})
+            fingerprint = None if cache is None else self.fingerprint()
+            finite_state_machine = None if fingerprint is None else cache.get(fingerprint)
+            if finite_state_machine is None:
+                finite_state_machine = FiniteStateMachine(
+                    initial_states={0}
+                )
+                base_state, counter = self.build(finite_state_machine, 0, 1)
+                finite_state_machine.add_final_states({base_state})
+                if fingerprint is not None:
+                    cache.put(fingerprint, finite_state_machine)
+            self.finite_state_machine = finite_state_machine
+            self.prefilter = _prefilter(finite_state_machine)
+            self.engine = None
+            self.table = None
+        if mode is not None and mode != self.mode:
+            self.mode = mode
+            self.engine = None
+        if self.engine is None:
+            key = None
+            if cache is not None and self.mode in ("auto", "dfa", "table", "sparse", "bitset", "shift", "keywords"):
+                fingerprint = self.fingerprint() if fingerprint is None else fingerprint
+                key = None if fingerprint is None else f"{fingerprint}-{self.mode}"
+                self.engine = None if key is None else cache.get(key)
+            if self.engine is not None:
+                return
+            if self.mode == "auto":
+                if len(positions(self.finite_state_machine)) <= MAXIMUM_POSITIONS:
+                    self.engine = ShiftAndFiniteStateMachine(self.finite_state_machine)
+                elif self.keywords() is not None:
+                    self.engine = AhoCorasickAutomaton(self.keywords())
+                else:
+                    self.engine = self.finite_state_machine
+            elif self.mode == "nfa":
+                self.engine = self.finite_state_machine
+            elif self.mode == "dfa":
+                self.engine = self.finite_state_machine.minimize()
+            elif self.mode == "lazy":
+                self.engine = LazyDeterministicFiniteStateMachine(self.finite_state_machine, cache_size)
+            elif self.mode == "table":
+                self.engine = self.finite_state_machine.minimize().tabulate()
+            elif self.mode == "sparse":
+                self.engine = self.finite_state_machine.tabulate()
+            elif self.mode == "bitset":
+                self.engine = BitParallelFiniteStateMachine(self.finite_state_machine)
+            elif self.mode == "shift":
+                self.engine = ShiftAndFiniteStateMachine(self.finite_state_machine)
+            elif self.mode == "keywords":
+                keywords = self.keywords()
+                assert keywords is not None
+                self.engine = AhoCorasickAutomaton(keywords)
+            else:
+                raise Exception(f"Unknown mode: {self.mode}")
+            if key is not None:
+                cache.put(key, self.engine)
 
     def match(self, string: str, start: int = 0, end: int = None) -> str:
         """str: Returns the first match of this RE (self) in the string."""
         assert string
         self.compile()
-        end = len(string) if end is None else end
-        last_match = None
-        for position in range(start + 1, end + 1):
-            if self.finite_state_machine.accepts(string[start:position]):
-                last_match = string[start:position]
-        if last_match:
-            return last_match
+        position = self.engine.longest(string, start, end)
+        if position is not None:
+            return string[start:position]
 
     def match_all(self, string: str, start: int = 0, end: int = None) -> Iterator[str]:
         """iter of str: Yields the matches of this RE (self) in the string."""
@@ -85,28 +271,45 @@ class Expression:
         self.compile()
         end = len(string) if end is None else end
         while start < end:
-            last_match = None
-            for position in range(start + 1, end + 1):
-                if self.finite_state_machine.accepts(string[start:position]):
-                    last_match = string[start:position]
-            if last_match:
-                yield last_match
-                start += len(last_match)
+            position = self.engine.longest(string, start, end)
+            if position is not None:
+                yield string[start:position]
+                start = position
             start += 1
 
+    def match_many(self, strings: Iterable[str]) -> List[int]:
+        """list of int: Returns the length of the first match (see Expression.match) of this RE (self) in every str, 0
+            if there is none. The strs are matched together against the minimal DFA (see
+            TransitionTable.longest_many)."""
+        return self._table().longest_many(strings)
+
+    def accepts_many(self, strings: Iterable[str]) -> List[bool]:
+        """list of bool: Returns True for every str that is entirely matched by this RE (self) (see
+            TransitionTable.accepts_many)."""
+        return self._table().accepts_many(strings)
+
+    def _table(self) -> TransitionTable:
+        self.compile()
+        if isinstance(self.engine, TransitionTable):
+            return self.engine
+        if self.table is None:
+            cache = Expression.cache
+            fingerprint = None if cache is None else self.fingerprint()
+            key = None if fingerprint is None else f"{fingerprint}-table"
+            self.table = None if key is None else cache.get(key)
+            if self.table is None:
+                self.table = self.finite_state_machine.minimize().tabulate()
+                if key is not None:
+                    cache.put(key, self.table)
+        return self.table
+
     def search(self, string: str, start: int = 0, end: int = None) -> Tuple[int, str]:
         """tuple of int and str: Returns the first match and its position of this RE (self) in the string."""
         assert string
         self.compile()
-        end = len(string) if end is None else end
-        while start < end:
-            last_match = None
-            for position in range(start + 1, end + 1):
-                if self.finite_state_machine.accepts(string[start:position]):
-                    last_match = string[start:position]
-            if last_match:
-                return start, last_match
-            start += 1
+        match = self._search(string, start, end)
+        if match is not None:
+            return match[0], string[match[0]:match[1]]
 
     def search_all(self, string: str, start: int = 0, end: int = None) -> Iterator[Tuple[int, str]]:
         """iter of tuple of int and str: Yields all the matches and its positions of this RE (self) in the string."""
@@ -114,14 +317,114 @@ class Expression:
         self.compile()
         end = len(string) if end is None else end
         while start < end:
-            last_match = None
-            for position in range(start + 1, end + 1):
-                if self.finite_state_machine.accepts(string[start:position]):
-                    last_match = string[start:position]
-            if last_match:
-                yield start, last_match
-                start += len(last_match)
-            start += 1
+            match = self._search(string, start, end)
+            if match is None:
+                break
+            yield match[0], string[match[0]:match[1]]
+            start = match[1] + 1
+
+    def search_parallel(
+            self,
+            data: DataType,
+            start: int = 0,
+            end: int = None,
+            chunk_size: int = 1 << 20,
+            max_workers: int = None
+    ) -> Iterator[Tuple[int, str]]:
+        """iter of tuple of int and str: Yields the same matches as Expression.search_all, searching chunks of data (a
+            str, or bytes-like such as a mmap, decoded as latin-1) in a pool of processes.
+
+        Every chunk is searched with the longest match (see TransitionTable.maximum_length) of overlap, so the matches
+        that start in a chunk are found by its process as if the whole data was searched from the start of the chunk.
+        The search of a chunk only depends on where it starts: when the sequential search enters a chunk at a position
+        that the process of the chunk didn't search from (after a match that crossed the boundary), the matches that
+        start before the next position the process searched from are searched here, and from there the results of the
+        process are used. If the matches are unbounded, the data is searched sequentially.
+        """
+        assert chunk_size > 0
+        self.compile()
+        end = len(data) if end is None else end
+        overlap = self._table().maximum_length()
+        if overlap is None or end - start <= chunk_size:
+            if start < end:
+                yield from self.search_all(data if isinstance(data, str) else _text(data, 0, end), start, end)
+            return
+        boundaries = list(range(start, end, chunk_size)) + [end]
+        chunks = iter(zip(boundaries, boundaries[1:]))
+        max_workers = cpu_count() if max_workers is None else max_workers
+        with ProcessPoolExecutor(max_workers, initializer=_initialize, initargs=(self,)) as executor:
+            pending = deque()
+
+            def _submit():
+                for chunk_start, chunk_end in chunks:
+                    pending.append((chunk_end, executor.submit(
+                        _search_chunk,
+                        data[chunk_start:min(chunk_end + overlap, end)],
+                        chunk_start,
+                        chunk_end - chunk_start
+                    )))
+                    return
+
+            for _ in range(2 * max_workers):
+                _submit()
+            position = start
+            while pending:
+                chunk_end, future = pending.popleft()
+                records = future.result()
+                _submit()
+                if records[-1][1] is not None:
+                    records.append((chunk_end, None, None))
+                i = 0
+                while position < chunk_end:
+                    while records[i][1] is not None and records[i][1] < position:
+                        i += 1
+                    record_start, match_start, match_end = records[i]
+                    if record_start <= position:
+                        if match_start is None:
+                            position = chunk_end
+                            break
+                        yield match_start, _text(data, match_start, match_end)
+                        position = match_end + 1
+                        i += 1
+                        continue
+                    string = _text(data, position, min(record_start + overlap, end))
+                    match = self._search(string, 0, len(string))
+                    if match is None or position + match[0] >= record_start:
+                        position = record_start
+                        continue
+                    yield position + match[0], string[match[0]:match[1]]
+                    position += match[1] + 1
+
+    def _search(self, string: str, start: int = 0, end: int = None) -> Optional[Tuple[int, int]]:
+        """tuple of int and int: Returns the start and the end of the leftmost-longest match in string[start:end].
+
+        If every match contains a literal (see FiniteStateMachine.required_literal), the occurrences of the literal are
+        found with str.find and the engine only runs near them: a match that contains an occurrence starts at most
+        prefix elements before it, so only these starts are tried. If prefix is unbounded, the engine searches from
+        the start, but only if the literal occurs at all. If the literal occurs so often that more starts are tried than
+        the engine would scan elements (see PREFILTER_SPACING), the engine searches the rest of the str.
+        """
+        end = len(string) if end is None else end
+        if self.prefilter is None:
+            return self.engine.search(string, start, end)
+        literal, prefix = self.prefilter
+        position = start
+        tried = 0
+        while True:
+            literal_position = string.find(literal, position, end)
+            if literal_position < 0:
+                return None
+            if prefix is None:
+                return self.engine.search(string, position, end)
+            first_start = max(position, literal_position - prefix)
+            for match_start in range(first_start, literal_position + 1):
+                match_end = self.engine.longest(string, match_start, end)
+                if match_end is not None:
+                    return match_start, match_end
+            tried += literal_position + 1 - first_start
+            position = literal_position + 1
+            if tried > PREFILTER_STARTS and tried * PREFILTER_SPACING > position - start:
+                return self.engine.search(string, position, end)
 
     def split(self, string: str, start: int = 0, end: int = None) -> Tuple[str]:
         """tuple of str: Returns sequence that is separated in the matches of this RE (self) from the string."""
@@ -148,3 +451,9 @@ class Expression:
     ) -> Tuple[int, int]:
         """tuple of int and int: Builds the expression in the FSM."""
         raise NotImplementedError
+
+
+def _prefilter(finite_state_machine: FiniteStateMachine) -> Optional[Tuple[str, Optional[int]]]:
+    prefilter = finite_state_machine.required_literal()
+    if prefilter is not None and len(prefilter[0]) >= MINIMUM_LITERAL_LENGTH:
+        return prefilter
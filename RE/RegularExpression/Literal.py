@@ -1,4 +1,4 @@
-from typing import Tuple
+from typing import List, Optional, Tuple
 
 from RE.FiniteStateMachine import FiniteStateMachine
 from RE.RegularExpression.Expression import Expression
@@ -41,6 +41,12 @@ class Literal(Expression):
         assert isinstance(expression, Literal)
         return Range(self, expression)
 
+    def keywords(self) -> Optional[List[str]]:
+        return [self.literal]
+
+    def parameters(self) -> tuple:
+        return self.literal,
+
     def build(
             self,
             finite_state_machine: FiniteStateMachine,
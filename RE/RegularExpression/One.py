@@ -1,8 +1,8 @@
 from typing import Tuple
 
-from RE.FiniteStateMachine import FiniteStateMachine
+from RE.FiniteStateMachine import FiniteStateMachine, Symbol
 from RE.RegularExpression.Expression import Expression
-from RE.RegularExpression.Zero import Zero
+from RE.RegularExpression.Group import Group
 
 __all__ = (
     "One"
@@ -12,6 +12,9 @@ __all__ = (
 class One(Expression):
     """One-or-more expression implementation.
 
+    The inner blocks are built once, behind a loop state that they return to, so nested repetitions take linear space
+    instead of doubling at every level.
+
     Attributes:
         inner_blocks (list of Expression): The expressions in order.
 
@@ -34,18 +37,15 @@ class One(Expression):
             counter: int,
             end_state: int = None
     ) -> Tuple[int, int]:
-        for i, inner_block in enumerate(self.inner_blocks, 1):
-            base_state, counter = inner_block.build(
-                finite_state_machine,
-                base_state,
-                counter,
-                end_state
-                if i == len(self.inner_blocks)
-                else None
-            )
-        _, counter = Zero(*self.inner_blocks).build(
+        loop_state = counter
+        finite_state_machine.add_transition(Symbol.EPSILON, base_state, {loop_state})
+        base_state, counter = Group(*self.inner_blocks).build(
             finite_state_machine,
-            base_state,
-            counter
+            loop_state,
+            counter + 1
         )
+        finite_state_machine.add_transition(Symbol.EPSILON, base_state, {loop_state})
+        if end_state is not None:
+            finite_state_machine.add_transition(Symbol.EPSILON, base_state, {end_state})
+            return end_state, counter
         return base_state, counter
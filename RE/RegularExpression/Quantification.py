@@ -1,10 +1,9 @@
 from typing import Tuple
 
-from RE.FiniteStateMachine import FiniteStateMachine
-from RE.RegularExpression.Choose import Choose
+from RE.FiniteStateMachine import FiniteStateMachine, Symbol
 from RE.RegularExpression.Expression import Expression
 from RE.RegularExpression.Group import Group
-from RE.RegularExpression.Zero import Zero
+from RE.RegularExpression.One import One
 
 __all__ = (
     "Quantification"
@@ -14,11 +13,15 @@ __all__ = (
 class Quantification(Expression):
     """Quantification expression implementation.
 
+    A bounded repetition is built as a chain of maximum copies of the inner blocks, with an EPSILON exit after each of
+    the copies from the minimum on, so it takes O(maximum) states. An unbounded one ends with a One of the inner
+    blocks.
+
     Attributes:
         inner_blocks (list of Expression): The expression in order.
         exact (int): The exact number of times that the inner_blocks must appear.
-        minimum (int): The minimum number of times that the inner_blocks must appear.
-        maximum (int): The maximum number of times that the inner_blocks must appear.
+        minimum (int): The minimum number of times that the inner_blocks must appear (1 if only maximum is given).
+        maximum (int): The maximum number of times that the inner_blocks can appear (unbounded if None).
 
     Examples:
         >>> from RE.RegularExpression.Literal import Literal
@@ -40,6 +43,9 @@ class Quantification(Expression):
         self.maximum = maximum
         self.inner_blocks = list(inner_blocks)
 
+    def parameters(self) -> tuple:
+        return self.exact, self.minimum, self.maximum
+
     def build(
             self,
             finite_state_machine: FiniteStateMachine,
@@ -47,64 +53,45 @@ class Quantification(Expression):
             counter: int,
             end_state: int = None
     ) -> Tuple[int, int]:
-
-        def _exact() -> Tuple[int, int]:
+        group = Group(*self.inner_blocks)
+        if self.exact is not None:
             assert self.exact > 0
-            return (group * self.exact).build(
-                finite_state_machine,
-                base_state,
-                counter,
-                end_state
-            )
+            minimum = maximum = self.exact
+        else:
+            minimum = 1 if self.minimum is None else self.minimum
+            maximum = self.maximum
+            assert minimum >= 0 and (maximum is None or 0 < maximum and minimum <= maximum)
 
-        def _minimum_maximum() -> Tuple[int, int]:
-            assert self.minimum < self.maximum
-            return Choose(
-                *list(
-                    group * i
-                    for i in range(self.minimum, self.maximum + 1)
+        if minimum == maximum:
+            for i in range(1, maximum + 1):
+                base_state, counter = group.build(
+                    finite_state_machine,
+                    base_state,
+                    counter,
+                    end_state
+                    if i == maximum
+                    else None
                 )
-            ).build(
-                finite_state_machine,
-                base_state,
-                counter,
-                end_state
-            )
+            return base_state, counter
 
-        def _minimum() -> Tuple[int, int]:
-            assert self.minimum > 0
-            _base_state, _counter = (group * self.minimum).build(
-                finite_state_machine,
-                base_state,
-                counter,
-                end_state
-            )
-            return Zero(group).build(
-                finite_state_machine,
-                _base_state,
-                _counter,
-            )
+        if end_state is None and minimum == 0:
+            end_state = counter
+            counter += 1
+        if maximum is None:
+            initial_state = base_state
+            for _ in range(minimum - 1):
+                base_state, counter = group.build(finite_state_machine, base_state, counter)
+            base_state, counter = One(group).build(finite_state_machine, base_state, counter, end_state)
+            if minimum == 0:
+                finite_state_machine.add_transition(Symbol.EPSILON, initial_state, {base_state})
+            return base_state, counter
 
-        def _maximum() -> Tuple[int, int]:
-            return Choose(
-                *list(
-                    group * i
-                    for i in range(1, self.maximum + 1)
-                )
-            ).build(
-                finite_state_machine,
-                base_state,
-                counter,
-                end_state
-            )
-
-        group = Group(*self.inner_blocks)
-        if self.exact is not None:
-            return _exact()
-        elif self.minimum is not None and self.maximum is not None:
-            return _minimum_maximum()
-        elif self.minimum is not None:
-            return _minimum()
-        elif self.maximum is not None:
-            return _maximum()
-        raise Exception
+        if end_state is None:
+            end_state = counter
+            counter += 1
+        for i in range(maximum + 1):
+            if i >= minimum:
+                finite_state_machine.add_transition(Symbol.EPSILON, base_state, {end_state})
+            if i < maximum:
+                base_state, counter = group.build(finite_state_machine, base_state, counter)
+        return end_state, counter
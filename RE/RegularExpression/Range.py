@@ -1,7 +1,7 @@
 from typing import Tuple
 
 from RE.FiniteStateMachine import FiniteStateMachine
-from RE.RegularExpression.Choose import Choose
+from RE.IntervalSet import IntervalSet
 from RE.RegularExpression.Expression import Expression
 from RE.RegularExpression.Literal import Literal
 
@@ -13,9 +13,13 @@ __all__ = (
 class Range(Expression):
     """Range expression implementation.
 
+    The range is built as a single IntervalSet transition, whatever the number of elements it contains.
+
     Attributes:
         from_literal (Literal): The Literal of length 1 that starts the range.
         to_literal (Literal): The literal of length 1 that ends the range.
+        interval_set (IntervalSet): The elements to match: the range, and the ranges (or Literal of length 1)
+            alternated with it (the alternation is a new Range, the operands are left unchanged).
 
     Examples:
         >>> from RE.RegularExpression.Literal import Literal
@@ -27,13 +31,31 @@ class Range(Expression):
 
     from_literal: Literal
     to_literal: Literal
+    interval_set: IntervalSet
 
     def __init__(self, from_literal: Literal, to_literal: Literal):
         super().__init__()
         assert len(from_literal.literal) == 1
         assert len(to_literal.literal) == 1
+        assert from_literal.literal <= to_literal.literal
         self.from_literal = from_literal
         self.to_literal = to_literal
+        self.interval_set = IntervalSet((ord(from_literal.literal), ord(to_literal.literal)))
+
+    def alternate(self, expression: "Expression") -> "Expression":
+        if isinstance(expression, Range):
+            return self._union(expression.interval_set)
+        if isinstance(expression, Literal) and len(expression.literal) == 1:
+            return self._union(IntervalSet((ord(expression.literal), ord(expression.literal))))
+        return super().alternate(expression)
+
+    def _union(self, interval_set: IntervalSet) -> "Range":
+        expression = Range(self.from_literal, self.to_literal)
+        expression.interval_set = self.interval_set | interval_set
+        return expression
+
+    def parameters(self) -> tuple:
+        return self.interval_set.intervals,
 
     def build(
             self,
@@ -42,13 +64,16 @@ class Range(Expression):
             counter: int,
             end_state: int = None
     ) -> Tuple[int, int]:
-        base_state, counter = Choose(*[
-            Literal(chr(i))
-            for i in range(ord(self.from_literal.literal), ord(self.to_literal.literal) + 1)
-        ]).build(
-            finite_state_machine,
+        finite_state_machine.add_transition(
+            self.interval_set,
             base_state,
-            counter,
-            end_state
+            {counter}
+            if end_state is None
+            else {end_state}
         )
+        if end_state is None:
+            base_state = counter
+            counter += 1
+        else:
+            base_state = end_state
         return base_state, counter
@@ -1,6 +1,7 @@
 from typing import Union, Tuple
 
 from RE.FiniteStateMachine import FiniteStateMachine, Symbol
+from RE.IntervalSet import IntervalSet, interval_set_of
 from RE.RegularExpression.Expression import Expression
 
 __all__ = (
@@ -12,7 +13,8 @@ class Wildcard(Expression):
     """Wildcard expression implementation.
 
     Attributes:
-        wildcard_set (Union of str and frozenset): The set which contains the expected elements.
+        wildcard_set (Union of str, frozenset and IntervalSet): The set which contains the expected elements. A
+            frozenset of characters is built as an IntervalSet transition.
 
     Examples:
         >>> from RE.RegularExpression.Wildcard import Wildcard
@@ -21,12 +23,19 @@ class Wildcard(Expression):
         >>> print(expression.match(input("> ")))
     """
 
-    wildcard_set: Union[str, frozenset]
+    wildcard_set: Union[str, frozenset, IntervalSet]
 
-    def __init__(self, wildcard_set: Union[Symbol, frozenset] = Symbol.SIGMA):
+    def __init__(self, wildcard_set: Union[Symbol, frozenset, IntervalSet] = Symbol.SIGMA):
         super().__init__()
         self.wildcard_set = wildcard_set
 
+    def parameters(self) -> tuple:
+        if self.wildcard_set is Symbol.SIGMA:
+            return "SIGMA",
+        if type(self.wildcard_set) is IntervalSet:
+            return "IntervalSet", self.wildcard_set.intervals
+        return type(self.wildcard_set).__name__, tuple(sorted(self.wildcard_set))
+
     def build(
             self,
             finite_state_machine: FiniteStateMachine,
@@ -34,8 +43,11 @@ class Wildcard(Expression):
             counter: int,
             end_state: int = None
     ) -> Tuple[int, int]:
+        wildcard_set = self.wildcard_set
+        if type(wildcard_set) is frozenset and all(type(_) is str and len(_) == 1 for _ in wildcard_set):
+            wildcard_set = interval_set_of(wildcard_set)
         finite_state_machine.add_transition(
-            self.wildcard_set,
+            wildcard_set,
             base_state,
             {counter}
             if end_state is None
@@ -0,0 +1,272 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from RE.Alphabet import Alphabet
+from RE.FiniteStateMachine import FiniteStateMachine, KeyType, Symbol
+
+__all__ = (
+    "MAXIMUM_POSITIONS",
+    "positions",
+    "ShiftAndFiniteStateMachine"
+)
+
+MAXIMUM_POSITIONS = 64
+
+
+def positions(finite_state_machine: FiniteStateMachine) -> List[Tuple[KeyType, int]]:
+    """list of tuple of KeyType and int: Returns the positions of the Glushkov automaton of the FSM: every element and
+        state that a transition (other than an EPSILON transition) of the FSM leads to."""
+    return sorted(
+        {
+            (element, to_state)
+            for element, transitions in finite_state_machine.transitions.items()
+            if element is not Symbol.EPSILON
+            for to_states in transitions.values()
+            for to_state in to_states
+        },
+        key=lambda position: (position[1], repr(position[0]))
+    )
+
+
+class ShiftAndFiniteStateMachine:
+    """Shift-And simulation of the Glushkov automaton of a small FSM.
+
+    Every position (see positions, the positions that lead to the same state from the same positions being merged) is
+    a bit of a single int, bit 0 being the initial position. A position is only entered through its elements, so the
+    next positions of a set of positions D for a class c are follow(D) & masks[c]: the positions that follow D (which
+    doesn't depend on c) restricted to the positions of c. follow is computed with a lookup per non-empty byte of D in
+    precomputed tables. When the positions form a chain (a concatenation of single elements or sets of elements, like
+    a keyword or an operator) follow(D) is simply D << 1 and the search is the classic Shift-And. The FSM must have at
+    most MAXIMUM_POSITIONS positions.
+
+    Attributes:
+        alphabet (Alphabet): The class of every element.
+        position_count (int): Number of positions (without the initial position).
+        initial_states (int): The bitmask of the initial position.
+        final_states (int): The bitmask of the positions after which the FSM accepts.
+        chain (bool): True if follow(D) is D << 1.
+
+    Structures:
+        masks (list of int): The bitmask of the positions of each class.
+        follow (list of list of int): The bitmask of the positions that follow each subset of each byte of positions.
+
+    Examples:
+        >>> from RE.RegularExpression.Literal import Literal
+        >>> expression = Literal("return")
+        >>> expression.compile(mode="shift")
+        >>> print(expression.search(input("> ")))
+    """
+
+    alphabet: Alphabet
+    position_count: int
+    initial_states: int
+    final_states: int
+    chain: bool
+    masks: List[int]
+    follow: List[List[int]]
+
+    def __init__(self, finite_state_machine: FiniteStateMachine):
+        super().__init__()
+        position_list = positions(finite_state_machine)
+        assert len(position_list) <= MAXIMUM_POSITIONS
+        index = {position: i for i, position in enumerate(position_list, 1)}
+        connections = finite_state_machine.connections
+        final_states = finite_state_machine.final_states
+
+        def _follow(states: set) -> int:
+            mask = 0
+            for from_state in finite_state_machine.closure(states):
+                for element, to_states in connections.get(from_state, {}).items():
+                    if element is not Symbol.EPSILON:
+                        for to_state in to_states:
+                            mask |= 1 << index[element, to_state]
+            return mask
+
+        def _bits(mask: int) -> Iterator[int]:
+            while mask:
+                low = mask & -mask
+                yield low.bit_length() - 1
+                mask ^= low
+
+        follow_masks = [_follow(set(finite_state_machine.initial_states))]
+        follow_masks.extend(_follow({to_state}) for _, to_state in position_list)
+        predecessors = [0] * len(follow_masks)
+        for i, follow_mask in enumerate(follow_masks):
+            for j in _bits(follow_mask):
+                predecessors[j] |= 1 << i
+        # Positions that lead to the same state from the same positions are merged into a single position.
+        groups: Dict[Tuple[int, int], int] = {}
+        group_of = [0] * len(follow_masks)
+        for j, (_, to_state) in enumerate(position_list, 1):
+            group_of[j] = groups.setdefault((to_state, predecessors[j]), len(groups) + 1)
+        group_follow_masks = [0] * (len(groups) + 1)
+        self.alphabet = finite_state_machine.partition()
+        self.position_count = len(groups)
+        self.initial_states = 1
+        self.final_states = int(
+            not final_states.isdisjoint(finite_state_machine.closure(set(finite_state_machine.initial_states)))
+        )
+        self.masks = [0] * self.alphabet.class_count
+        element_classes: Dict[KeyType, frozenset] = {}
+        for i, follow_mask in enumerate(follow_masks):
+            for j in _bits(follow_mask):
+                group_follow_masks[group_of[i]] |= 1 << group_of[j]
+        for j, (element, to_state) in enumerate(position_list, 1):
+            if not final_states.isdisjoint(finite_state_machine.closure({to_state})):
+                self.final_states |= 1 << group_of[j]
+            if element not in element_classes:
+                element_classes[element] = self.alphabet.classes_of(element)
+            for element_class in element_classes[element]:
+                self.masks[element_class] |= 1 << group_of[j]
+        self.chain = all(
+            follow_mask == 1 << (i + 1)
+            for i, follow_mask in enumerate(group_follow_masks[:-1])
+        ) and group_follow_masks[-1] == 0
+        self.follow = []
+        for block in range((len(group_follow_masks) + 7) >> 3):
+            block_masks = group_follow_masks[block << 3:(block + 1) << 3]
+            table = [0] * 256
+            for subset in range(1, 1 << len(block_masks)):
+                low = subset & -subset
+                table[subset] = table[subset ^ low] | block_masks[low.bit_length() - 1]
+            self.follow.append(table)
+
+    def __call__(self, string: str) -> Iterator[Tuple[KeyType, int]]:
+        return self.run(string)
+
+    def _step(self, states: int, element_class: int) -> int:
+        if self.chain:
+            return states << 1 & self.masks[element_class]
+        if states < 256:
+            return self.follow[0][states] & self.masks[element_class]
+        follow_states = 0
+        for table in self.follow:
+            if states & 255:
+                follow_states |= table[states & 255]
+            states >>= 8
+            if not states:
+                break
+        return follow_states & self.masks[element_class]
+
+    def step(
+            self,
+            states: int,
+            element: str
+    ) -> int:
+        """int: Returns the bitmask of the next positions of the positions (a bitmask) for the element."""
+        return self._step(states, self.alphabet[element])
+
+    def run(
+            self,
+            string: str
+    ) -> Iterator[Tuple[KeyType, int]]:
+        """iter of tuple of str and int: Iterates the str through the automaton (the states are bitmasks)."""
+        current_states = self.initial_states
+        for element in string:
+            current_states = self.step(current_states, element)
+            yield element, current_states
+            if not current_states:
+                return
+        yield Symbol.EOF, current_states
+
+    def last(
+            self,
+            string: str
+    ) -> int:
+        """int: Returns the bitmask of the last positions of iterating the str through the automaton."""
+        step = self._step
+        alphabet = self.alphabet
+        current_states = self.initial_states
+        for element in string:
+            current_states = step(current_states, alphabet[element])
+            if not current_states:
+                break
+        return current_states
+
+    def accepts(
+            self,
+            string: str
+    ) -> bool:
+        """bool: Returns True if the last positions contain a final position after iterating the str through the
+            automaton."""
+        return bool(self.last(string) & self.final_states)
+
+    def longest(
+            self,
+            string: str,
+            start: int = 0,
+            end: int = None
+    ) -> Optional[int]:
+        """int: Returns the end of the longest non-empty prefix of string[start:end] accepted by the automaton, None if
+            there is none. The str is iterated once and the iteration stops as soon as there are no current positions.
+        """
+        end = len(string) if end is None else end
+        step = self._step
+        alphabet = self.alphabet
+        masks = self.masks
+        final_states = self.final_states
+        current_states = self.initial_states
+        last_position = None
+        if len(self.follow) == 1:
+            follow = self.follow[0]
+            for position in range(start, end):
+                current_states = follow[current_states] & masks[alphabet[string[position]]]
+                if not current_states:
+                    break
+                if current_states & final_states:
+                    last_position = position + 1
+            return last_position
+        for position in range(start, end):
+            current_states = step(current_states, alphabet[string[position]])
+            if not current_states:
+                break
+            if current_states & final_states:
+                last_position = position + 1
+        return last_position
+
+    def search(
+            self,
+            string: str,
+            start: int = 0,
+            end: int = None
+    ) -> Optional[Tuple[int, int]]:
+        """tuple of int and int: Returns the start and the end of the leftmost-longest non-empty substring of
+            string[start:end] accepted by the automaton, None if there is none (see FiniteStateMachine.search).
+
+        If the positions form a chain with a single final position, every match has the same length and the first
+        match to end is the leftmost one, so the initial position is simply added at every step (Shift-And).
+        """
+        end = len(string) if end is None else end
+        alphabet = self.alphabet
+        final_states = self.final_states
+        if self.chain and final_states == 1 << self.position_count:
+            masks = self.masks
+            current_states = 0
+            for position in range(start, end):
+                current_states = (current_states << 1 | 2) & masks[alphabet[string[position]]]
+                if current_states & final_states:
+                    return position + 1 - self.position_count, position + 1
+            return None
+        step = self._step
+        threads: List[Tuple[int, int]] = []
+        match_start = match_end = None
+        for position in range(start, end):
+            if match_start is None and all(current_states != self.initial_states for _, current_states in threads):
+                threads.append((position, self.initial_states))
+            element_class = alphabet[string[position]]
+            new_threads = []
+            seen_states = 0
+            for thread_start, current_states in threads:
+                if match_start is not None and thread_start > match_start:
+                    break
+                current_states = step(current_states, element_class) & ~seen_states
+                if not current_states:
+                    continue
+                seen_states |= current_states
+                new_threads.append((thread_start, current_states))
+                if current_states & final_states and (match_start is None or thread_start <= match_start):
+                    match_start, match_end = thread_start, position + 1
+            threads = new_threads
+            if match_start is not None and not threads:
+                break
+        if match_start is not None:
+            return match_start, match_end
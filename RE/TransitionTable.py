@@ -0,0 +1,432 @@
+from array import array
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+from RE.Alphabet import Alphabet
+from RE.FiniteStateMachine import KeyType, Symbol
+
+__all__ = (
+    "TransitionTable",
+    "SparseTransitionTable"
+)
+
+
+class TransitionTable:
+    """Read-only, array-backed representation of a DFA.
+
+    The elements are mapped to equivalence classes (elements that lead every state to the same next state share a
+    class) and the next state of a state for a class is stored at table[state * class_count + class], -1 meaning that
+    the DFA gets stuck. Instances are usually created
+    with RE.DeterministicFiniteStateMachine.DeterministicFiniteStateMachine.tabulate.
+
+    Attributes:
+        initial_state (int): Initial state of the DFA.
+        state_count (int): Number of states, numbered from 0 to state_count - 1.
+        class_count (int): Number of equivalence classes.
+
+    Structures:
+        alphabet (Alphabet): The class of every element.
+        table (array of int): The next state of each state for each class.
+        final_states (bytearray): 1 for the final states, 0 for the rest.
+        tags (array of int): The tag of the final states (see DeterministicFiniteStateMachine.tags), -1 for the rest.
+
+    Examples:
+        >>> from RE.RegularExpression.Literal import Literal
+        >>> expression = (Literal("0") >> Literal("9")) + Literal(".")
+        >>> expression.compile(mode="table")
+        >>> print(expression.engine.class_count, expression.match(input("> ")))
+    """
+
+    initial_state: int
+    state_count: int
+    class_count: int
+    alphabet: Alphabet
+    table: array
+    final_states: bytearray
+    tags: array
+
+    def __init__(
+            self,
+            alphabet: Alphabet,
+            table: array,
+            final_states: bytearray,
+            initial_state: int = 0,
+            tags: array = None
+    ):
+        super().__init__()
+        self.alphabet = alphabet
+        self.table = table
+        self.final_states = final_states
+        self.initial_state = initial_state
+        self.tags = array("i", (0 if final else -1 for final in final_states)) if tags is None else tags
+        self.state_count = len(final_states)
+        self.class_count = len(table) // self.state_count if self.state_count else 1
+
+    def __call__(self, string: str) -> Iterator[Tuple[KeyType, int]]:
+        return self.run(string)
+
+    def step(
+            self,
+            state: int,
+            element: str
+    ) -> int:
+        """int: Returns the next state of the state for the element, -1 if there is none."""
+        return self.table[state * self.class_count + self.alphabet[element]]
+
+    def run(
+            self,
+            string: str
+    ) -> Iterator[Tuple[KeyType, int]]:
+        """iter of tuple of str and int: Iterates the str through the DFA."""
+        table = self.table
+        alphabet = self.alphabet
+        class_count = self.class_count
+        state = self.initial_state
+        for element in string:
+            state = table[state * class_count + alphabet[element]]
+            yield element, state
+            if state < 0:
+                return
+        yield Symbol.EOF, state
+
+    def last(
+            self,
+            string: str
+    ) -> int:
+        """int: Returns the last state of iterating the str through the DFA, -1 if the DFA got stuck."""
+        table = self.table
+        alphabet = self.alphabet
+        class_count = self.class_count
+        state = self.initial_state
+        for element in string:
+            state = table[state * class_count + alphabet[element]]
+            if state < 0:
+                break
+        return state
+
+    def accepts(
+            self,
+            string: str
+    ) -> bool:
+        """bool: Returns True if the last state is a final state after iterating the str through the DFA."""
+        state = self.last(string)
+        return state >= 0 and self.final_states[state] == 1
+
+    def longest(
+            self,
+            string: str,
+            start: int = 0,
+            end: int = None
+    ) -> Optional[int]:
+        """int: Returns the end of the longest non-empty prefix of string[start:end] accepted by the DFA, None if there
+            is none. The str is iterated once and the iteration stops as soon as the DFA gets stuck."""
+        end = len(string) if end is None else end
+        table = self.table
+        alphabet = self.alphabet
+        class_count = self.class_count
+        final_states = self.final_states
+        state = self.initial_state
+        last_position = None
+        for position in range(start, end):
+            state = table[state * class_count + alphabet[string[position]]]
+            if state < 0:
+                break
+            if final_states[state]:
+                last_position = position + 1
+        return last_position
+
+    def search(
+            self,
+            string: str,
+            start: int = 0,
+            end: int = None
+    ) -> Optional[Tuple[int, int]]:
+        """tuple of int and int: Returns the start and the end of the leftmost-longest non-empty substring of
+            string[start:end] accepted by the DFA, None if there is none (see DeterministicFiniteStateMachine.search).
+        """
+        end = len(string) if end is None else end
+        table = self.table
+        alphabet = self.alphabet
+        class_count = self.class_count
+        final_states = self.final_states
+        initial_state = self.initial_state
+        threads: List[Tuple[int, int]] = []
+        match_start = match_end = None
+        for position in range(start, end):
+            if match_start is None and all(state != initial_state for _, state in threads):
+                threads.append((position, initial_state))
+            element_class = alphabet[string[position]]
+            new_threads = []
+            seen_states = set()
+            for thread_start, state in threads:
+                if match_start is not None and thread_start > match_start:
+                    break
+                state = table[state * class_count + element_class]
+                if state < 0 or state in seen_states:
+                    continue
+                seen_states.add(state)
+                new_threads.append((thread_start, state))
+                if final_states[state] and (match_start is None or thread_start <= match_start):
+                    match_start, match_end = thread_start, position + 1
+            threads = new_threads
+            if match_start is not None and not threads:
+                break
+        if match_start is not None:
+            return match_start, match_end
+
+    def maximum_length(self) -> Optional[int]:
+        """int: Returns the length of the longest str accepted by the DFA, None if it is unbounded (or if the DFA
+            accepts nothing)."""
+        table = self.table
+        class_count = self.class_count
+        next_states = [
+            {to_state for to_state in table[state * class_count:(state + 1) * class_count] if to_state >= 0}
+            for state in range(self.state_count)
+        ]
+        previous_states: List[List[int]] = [[] for _ in range(self.state_count)]
+        for state, to_states in enumerate(next_states):
+            for to_state in to_states:
+                previous_states[to_state].append(state)
+        live_states = {state for state in range(self.state_count) if self.final_states[state]}
+        pending = list(live_states)
+        while pending:
+            for from_state in previous_states[pending.pop()]:
+                if from_state not in live_states:
+                    live_states.add(from_state)
+                    pending.append(from_state)
+        if self.initial_state not in live_states:
+            return None
+        degrees = {state: len(next_states[state] & live_states) for state in live_states}
+        lengths = {}
+        pending = [state for state, degree in degrees.items() if degree == 0]
+        while pending:
+            state = pending.pop()
+            lengths[state] = max(
+                (lengths[to_state] + 1 for to_state in next_states[state] if to_state in live_states),
+                default=0
+            )
+            for from_state in previous_states[state]:
+                if from_state in live_states:
+                    degrees[from_state] -= 1
+                    if degrees[from_state] == 0:
+                        pending.append(from_state)
+        return lengths.get(self.initial_state)
+
+    def _run_many(self, strings: List[str]) -> Tuple[List[int], List[bool]]:
+        import numpy
+        count = len(strings)
+        codes = numpy.array(strings, dtype=str)
+        width = codes.dtype.itemsize // 4
+        lengths = numpy.char.str_len(codes)
+        codes = codes.view(numpy.uint32).reshape(count, width)
+        classes = numpy.asarray(self.alphabet.interval_classes, dtype=numpy.intp)[
+            numpy.searchsorted(numpy.asarray(self.alphabet.boundaries, dtype=numpy.uint32), codes, side="right")
+        ]
+        table = numpy.asarray(self.table, dtype=numpy.intp)
+        final_states = numpy.frombuffer(bytes(self.final_states), dtype=numpy.uint8).astype(bool)
+        class_count = self.class_count
+        states = numpy.full(count, self.initial_state, dtype=numpy.intp)
+        ends = numpy.zeros(count, dtype=numpy.intp)
+        active = numpy.flatnonzero(lengths)
+        for position in range(width):
+            active = active[lengths[active] > position]
+            if not active.size:
+                break
+            next_states = table[states[active] * class_count + classes[active, position]]
+            states[active] = next_states
+            alive = next_states >= 0
+            active = active[alive]
+            next_states = next_states[alive]
+            ends[active[final_states[next_states]]] = position + 1
+        accepted = states >= 0
+        accepted[accepted] = final_states[states[accepted]]
+        return ends.tolist(), accepted.tolist()
+
+    def _many(self, strings: Iterable[str], batch_size: int) -> Tuple[List[int], List[bool]]:
+        ends = []
+        accepts = []
+        strings = iter(strings)
+        batch = list(islice(strings, batch_size))
+        while batch:
+            batch_ends, batch_accepts = self._run_many(batch)
+            ends += batch_ends
+            accepts += batch_accepts
+            batch = list(islice(strings, batch_size))
+        return ends, accepts
+
+    def longest_many(self, strings: Iterable[str], batch_size: int = 1 << 14) -> List[int]:
+        """list of int: Returns the end of the longest non-empty prefix of every str accepted by the DFA, 0 if there is
+            none.
+
+        If NumPy is installed, the strs are read batch_size at a time into a matrix of classes (padded to the longest
+        str of the batch) and stepped together, one gather in the table per position for every str still running.
+        """
+        try:
+            import numpy
+        except ImportError:
+            return [self.longest(string) or 0 for string in strings]
+        return self._many(strings, batch_size)[0]
+
+    def accepts_many(self, strings: Iterable[str], batch_size: int = 1 << 14) -> List[bool]:
+        """list of bool: Returns True for every str that the DFA accepts (see TransitionTable.longest_many)."""
+        try:
+            import numpy
+        except ImportError:
+            return [self.accepts(string) for string in strings]
+        return self._many(strings, batch_size)[1]
+
+
+class SparseTransitionTable:
+    """Read-only, array-backed representation of a NFA in compressed sparse row (CSR) layout.
+
+    The elements are mapped to equivalence classes like in TransitionTable. The EPSILON closure of the next states of
+    a state for a class are stored at targets[offsets[i]:offsets[i + 1]], with i = state * class_count + class.
+    Instances are usually created with RE.FiniteStateMachine.FiniteStateMachine.tabulate.
+
+    Attributes:
+        class_count (int): Number of equivalence classes.
+
+    Structures:
+        alphabet (Alphabet): The class of every element.
+        offsets (array of int): Where the next states of each state and class start in targets.
+        targets (array of int): The next states of every state and class, one after the other.
+        initial_states (frozenset of int): EPSILON closure of the initial states.
+        final_states (bytearray): 1 for the final states, 0 for the rest.
+    """
+
+    class_count: int
+    alphabet: Alphabet
+    offsets: array
+    targets: array
+    initial_states: frozenset
+    final_states: bytearray
+
+    def __init__(
+            self,
+            alphabet: Alphabet,
+            offsets: array,
+            targets: array,
+            initial_states: frozenset,
+            final_states: bytearray
+    ):
+        super().__init__()
+        self.alphabet = alphabet
+        self.offsets = offsets
+        self.targets = targets
+        self.initial_states = initial_states
+        self.final_states = final_states
+        self.class_count = (len(offsets) - 1) // len(final_states) if final_states else 1
+
+    def __call__(self, string: str) -> Iterator[Tuple[KeyType, frozenset]]:
+        return self.run(string)
+
+    def step(
+            self,
+            states: Set[int],
+            element: str
+    ) -> Set[int]:
+        """set of int: Returns the next states of the states for the element."""
+        offsets = self.offsets
+        targets = self.targets
+        class_count = self.class_count
+        element_class = self.alphabet[element]
+        new_states = set()
+        for state in states:
+            i = state * class_count + element_class
+            if offsets[i] != offsets[i + 1]:
+                new_states.update(targets[offsets[i]:offsets[i + 1]])
+        return new_states
+
+    def _final(self, states: Set[int]) -> bool:
+        final_states = self.final_states
+        return any(final_states[state] for state in states)
+
+    def run(
+            self,
+            string: str
+    ) -> Iterator[Tuple[KeyType, frozenset]]:
+        """iter of tuple of str and frozenset of int: Iterates the str through the NFA."""
+        current_states = set(self.initial_states)
+        for element in string:
+            current_states = self.step(current_states, element)
+            yield element, frozenset(current_states)
+            if not current_states:
+                return
+        yield Symbol.EOF, frozenset(current_states)
+
+    def last(
+            self,
+            string: str
+    ) -> Set[int]:
+        """set of int: Returns the last states of iterating the str through the NFA."""
+        current_states = set(self.initial_states)
+        for element in string:
+            if not current_states:
+                break
+            current_states = self.step(current_states, element)
+        return current_states
+
+    def accepts(
+            self,
+            string: str
+    ) -> bool:
+        """bool: Returns True if the at least one of the last states is a final states after iterating the str through
+            the NFA."""
+        return self._final(self.last(string))
+
+    def longest(
+            self,
+            string: str,
+            start: int = 0,
+            end: int = None
+    ) -> Optional[int]:
+        """int: Returns the end of the longest non-empty prefix of string[start:end] accepted by the NFA, None if there
+            is none. The str is iterated once and the iteration stops as soon as there are no current states."""
+        end = len(string) if end is None else end
+        current_states = set(self.initial_states)
+        last_position = None
+        for position in range(start, end):
+            current_states = self.step(current_states, string[position])
+            if not current_states:
+                break
+            if self._final(current_states):
+                last_position = position + 1
+        return last_position
+
+    def search(
+            self,
+            string: str,
+            start: int = 0,
+            end: int = None
+    ) -> Optional[Tuple[int, int]]:
+        """tuple of int and int: Returns the start and the end of the leftmost-longest non-empty substring of
+            string[start:end] accepted by the NFA, None if there is none (see FiniteStateMachine.search)."""
+        end = len(string) if end is None else end
+        threads: List[Tuple[int, Set[int]]] = []
+        match_start = match_end = None
+        for position in range(start, end):
+            if match_start is None:
+                seen_states = set(self.initial_states)
+                for _, current_states in threads:
+                    seen_states.difference_update(current_states)
+                if seen_states:
+                    threads.append((position, seen_states))
+            element = string[position]
+            new_threads = []
+            seen_states = set()
+            for thread_start, current_states in threads:
+                if match_start is not None and thread_start > match_start:
+                    break
+                current_states = self.step(current_states, element)
+                current_states.difference_update(seen_states)
+                if not current_states:
+                    continue
+                seen_states.update(current_states)
+                new_threads.append((thread_start, current_states))
+                if self._final(current_states) and (match_start is None or thread_start <= match_start):
+                    match_start, match_end = thread_start, position + 1
+            threads = new_threads
+            if match_start is not None and not threads:
+                break
+        if match_start is not None:
+            return match_start, match_end
@@ -1,13 +1,26 @@
-# TODO: Implement the usage of RE.FiniteStateMachine.Symbol
+from array import array
+from struct import Struct
+from sys import byteorder
+from typing import Union
 
-from RE.FiniteStateMachine import FiniteStateMachine
+from RE.Alphabet import Alphabet
+from RE.DeterministicFiniteStateMachine import DeterministicFiniteStateMachine
+from RE.FiniteStateMachine import FiniteStateMachine, KeyType, Symbol
+from RE.IntervalSet import IntervalSet
+from RE.TransitionTable import TransitionTable
 
 __all__ = (
     "draw_finite_state_machine",
     "export_finite_state_machine",
-    "import_finite_state_machine"
+    "import_finite_state_machine",
+    "export_transition_table",
+    "import_transition_table"
 )
 
+MAGIC = b"RETT"
+VERSION = 1
+HEADER = Struct("<4sIIIiI")
+
 
 def draw_finite_state_machine(finite_state_machine: FiniteStateMachine, path: str):
     """Creates a directed non-strict multi graph image representation of the FSM."""
@@ -26,15 +39,58 @@ def draw_finite_state_machine(finite_state_machine: FiniteStateMachine, path: st
     graph.draw(path, prog="dot")
 
 
-def export_finite_state_machine(finite_state_machine: FiniteStateMachine, path: str):
-    """Exports a json representation of a FSM."""
+def _encode_element(element: KeyType) -> str:
+    """str: Returns the json key of a transition element: the element itself if it is a single character, a json
+        object tagged with its kind otherwise."""
+    from json import dumps
+    if type(element) is str and len(element) == 1:
+        return element
+    if isinstance(element, Symbol):
+        return dumps({"symbol": element.name})
+    if type(element) is IntervalSet:
+        return dumps({"intervals": [list(interval) for interval in element.intervals]})
+    if type(element) is frozenset:
+        return dumps({"elements": sorted(element)})
+    raise Exception(f"Unknown element: {element!r}")
+
+
+def _decode_element(key: str) -> KeyType:
+    """KeyType: Returns the transition element of a json key (see _encode_element)."""
+    from json import loads
+    if len(key) == 1:
+        return key
+    data = loads(key)
+    if "symbol" in data:
+        return Symbol[data["symbol"]]
+    if "intervals" in data:
+        return IntervalSet(*(tuple(interval) for interval in data["intervals"]))
+    if "elements" in data:
+        return frozenset(data["elements"])
+    raise Exception(f"Unknown element: {key}")
+
+
+def export_finite_state_machine(
+        finite_state_machine: Union[FiniteStateMachine, DeterministicFiniteStateMachine],
+        path: str
+):
+    """Exports a json representation of a FSM (or of a DFA). The transition elements that are not single characters
+        are stored as json objects (see _encode_element)."""
     from json import dump
+    if isinstance(finite_state_machine, DeterministicFiniteStateMachine):
+        dump(dict(
+            boundaries=finite_state_machine.alphabet.boundaries,
+            interval_classes=finite_state_machine.alphabet.interval_classes,
+            initial_state=finite_state_machine.initial_state,
+            final_states=sorted(finite_state_machine.final_states),
+            transitions=finite_state_machine.transitions
+        ), open(path, "w"))
+        return
     data = {}
     for element, connections in finite_state_machine.transitions.items():
-        element = tuple(element) if type(element) is frozenset else element
-        data[element] = {}
+        key = _encode_element(element)
+        data[key] = {}
         for from_state, to_states in connections.items():
-            data[element][from_state] = tuple(to_states)
+            data[key][from_state] = tuple(to_states)
     data.update(
         initial_states=tuple(finite_state_machine.initial_states),
         final_states=tuple(finite_state_machine.final_states),
@@ -42,18 +98,94 @@ def export_finite_state_machine(finite_state_machine: FiniteStateMachine, path:
     dump(data, open(path, "w"))
 
 
-def import_finite_state_machine(path: str) -> FiniteStateMachine:
-    """Imports a json representation of a FSM."""
+def import_finite_state_machine(path: str) -> Union[FiniteStateMachine, DeterministicFiniteStateMachine]:
+    """Imports a json representation of a FSM (or of a DFA)."""
     from json import load
     data = load(open(path, "r"))
+    if "initial_state" in data:
+        deterministic_finite_state_machine = DeterministicFiniteStateMachine(
+            Alphabet(data["boundaries"], data["interval_classes"]),
+            data["initial_state"],
+            set(data["final_states"])
+        )
+        for from_state, transitions in data["transitions"].items():
+            for element_class, to_state in transitions.items():
+                deterministic_finite_state_machine.add_transition(int(element_class), int(from_state), to_state)
+        return deterministic_finite_state_machine
     initial_states = set(data.pop("initial_states"))
     final_states = set(data.pop("final_states"))
-    transitions = {}
-    for element, connections in data.items():
-        element = frozenset(element) if type(element) is tuple else element
-        transitions[element] = {}
-        for from_state, to_states in connections.items():
-            transitions[element][int(from_state)] = set(to_states)
     finite_state_machine = FiniteStateMachine(initial_states, final_states)
-    finite_state_machine.transitions = transitions
+    for key, connections in data.items():
+        element = _decode_element(key)
+        for from_state, to_states in connections.items():
+            finite_state_machine.add_transition(element, int(from_state), set(to_states))
     return finite_state_machine
+
+
+def export_transition_table(transition_table: TransitionTable, path: str):
+    """Exports a binary representation of a TransitionTable.
+
+    The file is made of a header (magic, version, state count, class count, initial state and boundary count)
+    followed by the boundaries and the interval classes of the alphabet, the table and the tags as little-endian
+    32-bit integers, and the final states as one byte per state.
+    """
+    alphabet = transition_table.alphabet
+    sections = [
+        array("i", alphabet.boundaries),
+        array("i", alphabet.interval_classes),
+        array("i", transition_table.table),
+        array("i", transition_table.tags)
+    ]
+    if byteorder != "little":
+        for section in sections:
+            section.byteswap()
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(
+            MAGIC,
+            VERSION,
+            transition_table.state_count,
+            transition_table.class_count,
+            transition_table.initial_state,
+            len(alphabet.boundaries)
+        ))
+        for section in sections:
+            section.tofile(file)
+        file.write(bytes(transition_table.final_states))
+
+
+def import_transition_table(path: str, memory_map: bool = True) -> TransitionTable:
+    """TransitionTable: Imports a binary representation of a TransitionTable.
+
+    With memory_map, the file is mapped in memory and the table, the tags and the final states are read-only views
+    of the mapping, so loading costs the same whatever the size of the table and processes that load the same file
+    share its pages. Only the alphabet is copied.
+    """
+    from mmap import mmap, ACCESS_READ
+    with open(path, "rb") as file:
+        if memory_map and byteorder == "little":
+            data = memoryview(mmap(file.fileno(), 0, access=ACCESS_READ))
+        else:
+            data = memoryview(file.read())
+    magic, version, state_count, class_count, initial_state, boundary_count = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise Exception(f"Not a transition table: {path}")
+    if version != VERSION:
+        raise Exception(f"Unsupported transition table version: {version}")
+    offset = HEADER.size
+    sections = []
+    for count in (boundary_count, boundary_count + 1, state_count * class_count, state_count):
+        section = data[offset:offset + 4 * count].cast("i")
+        if byteorder != "little":
+            section = array("i", section)
+            section.byteswap()
+        sections.append(section)
+        offset += 4 * count
+    boundaries, interval_classes, table, tags = sections
+    final_states = data[offset:offset + state_count]
+    return TransitionTable(
+        Alphabet(list(boundaries), list(interval_classes)),
+        table,
+        final_states,
+        initial_state,
+        tags
+    )
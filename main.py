@@ -28,6 +28,9 @@ sentences = {
 }
 
 parser = Parser(**sentences)
+parser.add_precedence("left", "OR")
+parser.add_precedence("left", "AND")
+parser.add_precedence("right", "NOT")
 
 string = input("> ")
 
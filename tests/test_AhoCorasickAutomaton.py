@@ -0,0 +1,35 @@
+from random import Random
+from unittest import TestCase
+
+from RE.AhoCorasickAutomaton import AhoCorasickAutomaton
+from RE.RegularExpression.Choose import Choose
+from RE.RegularExpression.Literal import Literal
+
+
+class AhoCorasickAutomatonTest(TestCase):
+    def test_against_nfa(self):
+        random = Random(0)
+        for keywords in (
+                ["if", "elif", "else", "while"],
+                ["a", "ab", "bab", "bc", "c", "caa"],
+                ["abcab", "bca", "cab", "b"],
+                ["aaa", "aa"]
+        ):
+            expression = Choose(*(Literal(keyword) for keyword in keywords))
+            self.assertEqual(sorted(expression.keywords()), sorted(keywords))
+            expression.compile(mode="nfa")
+            finite_state_machine = expression.finite_state_machine
+            automaton = AhoCorasickAutomaton(keywords)
+            alphabet = "".join(sorted(set("".join(keywords)))) + "x"
+            for _ in range(300):
+                string = "".join(random.choice(alphabet) for _ in range(random.randint(0, 30)))
+                start = random.randint(0, 3)
+                end = random.choice((None, max(start, len(string) - random.randint(0, 3))))
+                self.assertEqual(automaton.accepts(string), finite_state_machine.accepts(string))
+                self.assertEqual(
+                    automaton.longest(string, start, end),
+                    finite_state_machine.longest(string, start, end)
+                )
+                self.assertEqual(automaton.search(string, start, end), finite_state_machine.search(string, start, end))
+            expression.compile(mode="keywords")
+            self.assertIsInstance(expression.engine, AhoCorasickAutomaton)
@@ -0,0 +1,52 @@
+from os import listdir
+from shutil import rmtree
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from RE.CompileCache import CompileCache
+from RE.RegularExpression.Expression import Expression
+from RE.RegularExpression.Literal import Literal
+from RE.RegularExpression.One import One
+from RE.RegularExpression.Zero import Zero
+
+
+def _expression() -> Expression:
+    return Literal("a") + Zero(Literal("b") | Literal("c")) + One(Literal("0") >> Literal("9"))
+
+
+class CompileCacheTest(TestCase):
+    def setUp(self):
+        self.cache = Expression.cache
+
+    def tearDown(self):
+        Expression.cache = self.cache
+
+    def test_disk_cache(self):
+        strings = ["a1", "abc12", "ab", "xabcb9y", "a", "acb0c", "abcabc123"]
+        reference = _expression()
+        reference.compile(mode="nfa")
+        with TemporaryDirectory() as directory:
+            for mode in ("table", "dfa", "sparse"):
+                Expression.cache = CompileCache(directory)
+                _expression().compile(mode=mode)
+                Expression.cache = CompileCache(directory)
+                expression = _expression()
+                expression.compile(mode=mode)
+                self.assertEqual(Expression.cache.misses, 0)
+                self.assertGreater(Expression.cache.hits, 0)
+                for string in strings:
+                    self.assertEqual(expression.match(string), reference.match(string))
+                    self.assertEqual(list(expression.search_all(string)), list(reference.search_all(string)))
+                self.assertEqual(expression.accepts_many(strings), reference.accepts_many(strings))
+            self.assertTrue(all(name.endswith(".pickle") for name in listdir(directory)))
+
+    def test_put_failures(self):
+        with TemporaryDirectory() as directory:
+            cache = CompileCache(directory)
+            cache.put("lambda", lambda: None)
+            self.assertIsNotNone(cache.get("lambda"))
+            self.assertEqual(listdir(directory), [])
+            rmtree(directory)
+            cache.put("missing", 1)
+            self.assertEqual(cache.get("missing"), 1)
+            self.assertIsNone(CompileCache(directory).get("lambda"))
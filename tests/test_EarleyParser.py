@@ -0,0 +1,48 @@
+from unittest import TestCase
+
+from RE.EarleyParser import EarleyParser, ForestNode
+from RE.Lexer import Token
+
+
+class EarleyParserTest(TestCase):
+    def test_ambiguous_unit(self):
+        parser = EarleyParser(S=[["a"], ["A"]], A=[["a"]])
+        forest = parser.parse([Token("a", "a")])
+        self.assertEqual(forest.count(), 2)
+        self.assertEqual(len(list(forest.trees())), 2)
+
+    def test_ambiguous_after_scan(self):
+        parser = EarleyParser(S=[["x", "a"], ["x", "A"]], A=[["a"]])
+        forest = parser.parse([Token("x", "x"), Token("a", "a")])
+        self.assertEqual(forest.count(), 2)
+        self.assertEqual(len(list(forest.trees())), 2)
+
+    def test_ambiguous_expression(self):
+        parser = EarleyParser(expression=[["number"], ["expression", "plus", "expression"]])
+        forest = parser.parse([Token("number", "1"), Token("plus", "+")] * 3 + [Token("number", "3")])
+        self.assertEqual(forest.count(), 5)
+
+    def test_deep_forest(self):
+        parser = EarleyParser(
+            expression=[["term"], ["expression", "OR", "term"]],
+            term=[["boolean"], ["term", "AND", "boolean"]]
+        )
+        tokens = [Token("boolean", "true")]
+        for i in range(5000):
+            tokens += [Token("OR" if i % 2 else "AND", "?"), Token("boolean", "false")]
+        forest = parser.parse(tokens)
+        self.assertEqual(forest.count(), 1)
+        tree, = forest.trees()
+        self.assertEqual(tree.name, "expression")
+
+    def test_empty_input(self):
+        parser = EarleyParser(S=[[], ["a"]])
+        forest = parser.parse([])
+        self.assertIsInstance(forest, ForestNode)
+        self.assertEqual(forest.count(), 1)
+        self.assertEqual([tree.children for tree in forest.trees()], [[]])
+
+    def test_scan_once(self):
+        parser = EarleyParser(S=[["A", "a"]], A=[[], ["B"]], B=[[]])
+        forest = parser.parse([Token("a", "a")])
+        self.assertEqual(forest.count(), 2)
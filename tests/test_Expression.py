@@ -0,0 +1,89 @@
+from random import Random
+from unittest import TestCase
+
+from RE.RegularExpression.Group import Group
+from RE.RegularExpression.Literal import Literal
+from RE.RegularExpression.Optional import Optional
+from RE.RegularExpression.Wildcard import Wildcard
+from RE.RegularExpression.Zero import Zero
+
+
+class Repeated(Group):
+    def __init__(self, literal: str, count: int):
+        super().__init__(Literal(literal))
+        self.count = count
+
+    def build(self, finite_state_machine, base_state, counter, end_state=None):
+        for _ in range(self.count - 1):
+            base_state, counter = super().build(finite_state_machine, base_state, counter)
+        return super().build(finite_state_machine, base_state, counter, end_state)
+
+
+class Opaque(Repeated):
+    def __init__(self, literal: str, count: int):
+        super().__init__(literal, count)
+        self.options = {"count": count}
+
+
+class ExpressionTest(TestCase):
+    def test_fingerprint_of_subclass_state(self):
+        two, three = Repeated("a", 2), Repeated("a", 3)
+        self.assertNotEqual(two.fingerprint(), three.fingerprint())
+        self.assertEqual(two.fingerprint(), Repeated("a", 2).fingerprint())
+        self.assertNotEqual(two.fingerprint(), Group(Literal("a")).fingerprint())
+        two.compile()
+        three.compile()
+        self.assertEqual(two.match("aaaa"), "aa")
+        self.assertEqual(three.match("aaaa"), "aaa")
+
+    def test_fingerprint_of_unknown_state(self):
+        self.assertIsNone(Opaque("a", 2).fingerprint())
+        self.assertIsNone(Group(Opaque("a", 2)).fingerprint())
+        expression = Opaque("a", 3)
+        expression.compile()
+        self.assertEqual(expression.match("aaaa"), "aaa")
+
+    def test_prefilter(self):
+        random = Random(0)
+        expressions = (
+            Optional(Literal("a") | Literal("b")) + Literal("abc") + Zero(Literal("c")),
+            Zero(Literal("a") >> Literal("c")) + Literal("cab"),
+            Zero(Wildcard()) + Literal("bca") + Literal("a"),
+            (Literal("c") | Literal("d")) + Literal("ab")
+        )
+        for expression in expressions:
+            expression.compile()
+        self.assertEqual([expression.prefilter[1] for expression in expressions], [1, None, None, 1])
+        short = Zero(Literal("b")) + Literal("a")
+        short.compile()
+        self.assertIsNone(short.prefilter)
+        for expression in expressions:
+            for mode in ("nfa", "table", "shift"):
+                expression.compile(mode=mode)
+                for length in (5, 50, 2000):
+                    string = "".join(random.choice("abcd") for _ in range(length))
+                    for start in (0, 3):
+                        self.assertEqual(expression._search(string, start), expression.engine.search(string, start))
+                string = "ab" * 1000 + "cabc"
+                self.assertEqual(expression._search(string), expression.engine.search(string))
+
+    def test_search_parallel(self):
+        random = Random(0)
+        expressions = (
+            Literal("ab") | Literal("abcab") | Literal("ca"),
+            (Literal("a") >> Literal("c")) + Optional(Literal("b") + Literal("c")),
+            Literal("a") + Zero(Literal("b"))
+        )
+        for expression in expressions:
+            expression.compile(mode="table")
+            reference = Group(expression)
+            reference.compile(mode="nfa")
+            for chunk_size in (1, 3, 7):
+                string = "".join(random.choice("abcd") for _ in range(100))
+                for start, end in ((0, None), (2, 97)):
+                    expected = list(reference.search_all(string, start, end))
+                    for data in (string, string.encode("latin-1")):
+                        self.assertEqual(
+                            list(expression.search_parallel(data, start, end, chunk_size=chunk_size, max_workers=2)),
+                            expected
+                        )
@@ -0,0 +1,61 @@
+from io import BytesIO, StringIO
+from unittest import TestCase
+
+from RE.Lexer import Lexer, TokenBuffer
+from RE.RegularExpression.Literal import Literal
+from RE.RegularExpression.One import One
+from RE.RegularExpression.Zero import Zero
+
+
+class LexerTest(TestCase):
+    def setUp(self):
+        self.lexer = Lexer(
+            word=One(Literal("a") >> Literal("z")),
+            space=Literal(" "),
+            number=One(Literal("0") >> Literal("9"))
+        )
+
+    def test_relex_token_buffer(self):
+        string = "ab 12 cd 3 efg"
+        tokens = TokenBuffer(self.lexer.lex(string))
+        for offset, deleted, inserted in ((3, 0, "x"), (0, 2, "9"), (9, 1, " z "), (5, 0, "")):
+            string = string[:offset] + inserted + string[offset + deleted:]
+            self.lexer.relex(string, tokens, offset, deleted, inserted)
+            self.assertEqual(list(tokens), list(self.lexer.lex(string)))
+
+    def test_relex_list(self):
+        string = "ab 12 cd"
+        tokens = list(self.lexer.lex(string))
+        string = "ab 1x2 cd"
+        self.lexer.relex(string, tokens, 4, 0, "x")
+        self.assertEqual(tokens, list(self.lexer.lex(string)))
+
+    def test_relex_unbounded_lookahead(self):
+        lexer = Lexer(
+            call=Literal("f") + Zero(Literal(" ")) + Literal("("),
+            word=One(Literal("a") >> Literal("z")),
+            space=Literal(" "),
+            parenthesis=Literal("(")
+        )
+        lexer.compile()
+        self.assertIsNone(lexer.lookahead)
+        string = "ab f " * 20000
+        tokens = TokenBuffer(lexer.lex(string))
+        for offset, deleted, inserted in ((len(string), 0, "("), (len(string) - 3, 0, "g "), (2, 1, "")):
+            string = string[:offset] + inserted + string[offset + deleted:]
+            first, last = lexer.relex(string, tokens, offset, deleted, inserted)
+            self.assertLess(last - first, 8)
+            self.assertEqual(list(tokens), list(lexer.lex(string)))
+
+    def test_lex_stream_chunks(self):
+        string = "ab 12 cd 345 efg 6"
+        expected = list(self.lexer.lex(string))
+        for chunk_size in (1, 2, 3, 5, 64):
+            self.assertEqual(list(self.lexer.lex_stream(StringIO(string), chunk_size)), expected)
+            chunks = [string[i:i + chunk_size] for i in range(0, len(string), chunk_size)]
+            self.assertEqual(list(self.lexer.lex_stream(iter(chunks))), expected)
+        self.assertEqual(list(self.lexer.lex_stream(["ab", "", "c 1", "", "2"])), list(self.lexer.lex("abc 12")))
+
+    def test_lex_stream_bytes(self):
+        with self.assertRaises(TypeError):
+            list(self.lexer.lex_stream(BytesIO(b"ab 12"), 2))
@@ -0,0 +1,15 @@
+from unittest import TestCase
+
+from RE.Lexer import Token
+from RE.Parser import Branch, Parser
+
+
+class ParserTest(TestCase):
+    def test_parse_tree(self):
+        parser = Parser(expression=[["expression", "plus", "number"], ["number"]])
+        tree = parser.parse([Token("number", "1"), Token("plus", "+"), Token("number", "2")])
+        self.assertIsInstance(tree, Branch)
+        self.assertEqual(tree.name, "expression")
+        self.assertEqual(tree.size, 3)
+        self.assertEqual(tree.children[0].size, 1)
+        self.assertFalse(hasattr(tree, "__dict__"))
@@ -0,0 +1,35 @@
+from random import Random
+from unittest import TestCase
+
+from RE.PatternSet import PatternSet
+from RE.RegularExpression.Literal import Literal
+from RE.RegularExpression.One import One
+from RE.RegularExpression.Optional import Optional
+from RE.RegularExpression.Wildcard import Wildcard
+from RE.RegularExpression.Zero import Zero
+
+
+class PatternSetTest(TestCase):
+    def test_against_nfa(self):
+        random = Random(0)
+        expressions = {
+            "word": One(Literal("a") >> Literal("c")),
+            "ab": Literal("ab"),
+            "abc": Literal("a") + Optional(Literal("b")) + Literal("c"),
+            "any": Wildcard() + Wildcard(),
+            "b": Zero(Literal("d")) + Literal("b")
+        }
+        pattern_set = PatternSet(**expressions)
+        for expression in expressions.values():
+            expression.compile(mode="nfa")
+        for _ in range(300):
+            string = "".join(random.choice("abcd") for _ in range(random.randint(1, 12)))
+            start = random.randint(0, len(string) - 1)
+            self.assertEqual(
+                pattern_set.match(string, start),
+                tuple(name for name, expression in expressions.items() if expression.match(string, start) is not None)
+            )
+            self.assertEqual(
+                pattern_set.fullmatch(string),
+                tuple(name for name, expression in expressions.items() if expression.engine.accepts(string))
+            )
@@ -0,0 +1,31 @@
+from itertools import product
+from re import fullmatch
+from unittest import TestCase
+
+from RE.RegularExpression.Literal import Literal
+from RE.RegularExpression.Quantification import Quantification
+
+
+class QuantificationTest(TestCase):
+    def test_bounds(self):
+        strings = ["".join(elements) for length in range(9) for elements in product("ab", repeat=length)]
+        for exact, minimum, maximum in (
+                (1, None, None), (3, None, None), (None, 0, 2), (None, 2, 4), (None, None, 3), (None, 2, None),
+                (None, 0, None)
+        ):
+            if exact is not None:
+                bounds = f"{{{exact}}}"
+            else:
+                bounds = f"{{{1 if minimum is None else minimum},{'' if maximum is None else maximum}}}"
+            pattern = f"(?:a|ab){bounds}"
+            expression = Quantification(Literal("a") | Literal("ab"), exact=exact, minimum=minimum, maximum=maximum)
+            for mode in ("nfa", "table", "shift"):
+                expression.compile(mode=mode)
+                for string in strings:
+                    self.assertEqual(expression.engine.accepts(string), fullmatch(pattern, string) is not None)
+                    if string:
+                        longest = max(
+                            (end for end in range(1, len(string) + 1) if fullmatch(pattern, string[:end])),
+                            default=None
+                        )
+                        self.assertEqual(expression.match(string), None if longest is None else string[:longest])
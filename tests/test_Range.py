@@ -0,0 +1,16 @@
+from unittest import TestCase
+
+from RE.RegularExpression.Literal import Literal
+from RE.RegularExpression.One import One
+
+
+class RangeTest(TestCase):
+    def test_alternate_keeps_operands(self):
+        digit = Literal("0") >> Literal("9")
+        letter = Literal("a") >> Literal("f")
+        hexadecimal = One(digit | letter | Literal("x"))
+        number = One(digit)
+        self.assertEqual(hexadecimal.match("f0x"), "f0x")
+        self.assertEqual(number.match("12"), "12")
+        self.assertIsNone(number.match("abc"))
+        self.assertIsNone(One(letter).match("x"))
@@ -0,0 +1,35 @@
+from random import Random
+from unittest import TestCase
+
+from RE.RegularExpression.Literal import Literal
+from RE.RegularExpression.One import One
+from RE.RegularExpression.Optional import Optional
+from RE.RegularExpression.Wildcard import Wildcard
+from RE.RegularExpression.Zero import Zero
+from RE.ShiftAndFiniteStateMachine import ShiftAndFiniteStateMachine
+
+
+class ShiftAndFiniteStateMachineTest(TestCase):
+    def test_against_nfa(self):
+        random = Random(0)
+        expressions = (
+            Literal("abcabcabcab"),
+            Literal("ab") | Literal("ba") | Literal("abc"),
+            Zero(Literal("a") | Literal("bc")) + Literal("c"),
+            One(Literal("a") >> Literal("b")) + Optional(Wildcard()) + Literal("c"),
+            Literal("a") + Zero(Wildcard()) + Literal("b") + Zero(Literal("c") + Literal("a"))
+        )
+        for expression in expressions:
+            expression.compile(mode="nfa")
+            finite_state_machine = expression.finite_state_machine
+            shift = ShiftAndFiniteStateMachine(finite_state_machine)
+            self.assertEqual(shift.chain, expression is expressions[0])
+            for _ in range(200):
+                string = "".join(random.choice("abcd") for _ in range(random.randint(0, 40)))
+                start = random.randint(0, 3)
+                end = random.choice((None, max(start, len(string) - random.randint(0, 3))))
+                self.assertEqual(shift.accepts(string), finite_state_machine.accepts(string))
+                self.assertEqual(shift.longest(string, start, end), finite_state_machine.longest(string, start, end))
+                self.assertEqual(shift.search(string, start, end), finite_state_machine.search(string, start, end))
+            string = "ab" * 100 + "abcabcabcab"
+            self.assertEqual(shift.search(string), finite_state_machine.search(string))
@@ -0,0 +1,29 @@
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from RE.RegularExpression.Literal import Literal
+from RE.RegularExpression.One import One
+from RE.RegularExpression.Wildcard import Wildcard
+from RE.Utility import export_finite_state_machine, import_finite_state_machine
+
+
+class UtilityTest(TestCase):
+    def assertRoundTrip(self, expression, strings):
+        expression.compile()
+        finite_state_machine = expression.finite_state_machine
+        with TemporaryDirectory() as directory:
+            file_path = path.join(directory, "expression.json")
+            export_finite_state_machine(finite_state_machine, file_path)
+            imported_finite_state_machine = import_finite_state_machine(file_path)
+        self.assertEqual(imported_finite_state_machine.transitions, finite_state_machine.transitions)
+        for string in strings:
+            self.assertEqual(imported_finite_state_machine.accepts(string), finite_state_machine.accepts(string))
+
+    def test_round_trip_range(self):
+        expression = Literal("x") + ((Literal("0") >> Literal("9")) | Literal("_"))
+        self.assertRoundTrip(expression, ["x0", "x_", "xa", "x", "x99"])
+
+    def test_round_trip_symbols(self):
+        expression = One(Literal("a") | Literal("b")) + Wildcard()
+        self.assertRoundTrip(expression, ["ab!", "a", "bbbz", "c", ""])